@@ -1,5 +1,17 @@
 from django.contrib import admin
-from .models import Module, Lesson, UserProgress, CodeSnippet, Quiz, UserQuizAttempt
+from django.http import StreamingHttpResponse
+from .exports import csv_chunks, progress_csv, quiz_attempt_csv
+from .models import (
+    Module, Lesson, UserProgress, ModuleProgress, CodeSnippet, Quiz, UserQuizAttempt, QuizAttemptSummary
+)
+from .progress import refresh_quiz_summaries
+
+
+def csv_response(header, rows, filename):
+    """Stream rows from lessons/exports.py as a CSV download"""
+    response = StreamingHttpResponse(csv_chunks(header, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
 
 @admin.register(Module)
@@ -32,7 +44,9 @@ class LessonAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Exercise', {
-            'fields': ('has_exercise', 'exercise_starter_code', 'exercise_solution', 'exercise_tests'),
+            'fields': (
+                'has_exercise', 'exercise_starter_code', 'exercise_solution', 'exercise_tests', 'exercise_models'
+            ),
             'classes': ('collapse',)
         })
     )
@@ -42,8 +56,23 @@ class LessonAdmin(admin.ModelAdmin):
 class UserProgressAdmin(admin.ModelAdmin):
     list_display = ['user', 'lesson', 'completed', 'exercise_completed', 'time_spent_seconds', 'last_accessed']
     list_filter = ['completed', 'exercise_completed', 'last_accessed']
+    list_select_related = ['user', 'lesson__module']
     search_fields = ['user__username', 'lesson__title']
     readonly_fields = ['last_accessed']
+    actions = ['export_csv']
+    
+    @admin.action(description='Export selected progress as CSV')
+    def export_csv(self, request, queryset):
+        return csv_response(*progress_csv(queryset), 'progress.csv')
+
+
+@admin.register(ModuleProgress)
+class ModuleProgressAdmin(admin.ModelAdmin):
+    list_display = ['user', 'module', 'completed_lessons', 'total_lessons', 'time_spent_seconds', 'updated_at']
+    list_filter = ['module']
+    list_select_related = ['user', 'module']
+    search_fields = ['user__username', 'module__title']
+    readonly_fields = ['completed_lessons', 'total_lessons', 'time_spent_seconds', 'updated_at']
 
 
 @admin.register(CodeSnippet)
@@ -66,5 +95,36 @@ class QuizAdmin(admin.ModelAdmin):
 class UserQuizAttemptAdmin(admin.ModelAdmin):
     list_display = ['user', 'quiz', 'selected_answer', 'is_correct', 'attempted_at']
     list_filter = ['is_correct', 'attempted_at']
+    list_select_related = ['user', 'quiz']
     search_fields = ['user__username']
     readonly_fields = ['attempted_at']
+    actions = ['export_csv']
+    
+    @admin.action(description='Export selected quiz attempts as CSV')
+    def export_csv(self, request, queryset):
+        return csv_response(*quiz_attempt_csv(queryset), 'quiz_attempts.csv')
+    
+    # Edits here bypass record_quiz_attempts, so refresh the summaries they touch
+    def save_model(self, request, obj, form, change):
+        previous = UserQuizAttempt.objects.filter(pk=obj.pk).values_list('user_id', 'quiz_id').first()
+        super().save_model(request, obj, form, change)
+        refresh_quiz_summaries({(obj.user_id, obj.quiz_id), *([previous] if previous else [])})
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_quiz_summaries([(obj.user_id, obj.quiz_id)])
+    
+    def delete_queryset(self, request, queryset):
+        pairs = set(queryset.values_list('user_id', 'quiz_id'))
+        super().delete_queryset(request, queryset)
+        refresh_quiz_summaries(pairs)
+
+
+@admin.register(QuizAttemptSummary)
+class QuizAttemptSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'quiz', 'attempts', 'last_is_correct', 'first_correct_at', 'last_attempted_at']
+    list_filter = ['last_is_correct']
+    list_select_related = ['user', 'quiz']
+    search_fields = ['user__username', 'quiz__question']
+    readonly_fields = ['attempts', 'first_attempted_at', 'first_correct_at',
+                       'last_answer', 'last_is_correct', 'last_attempted_at']
@@ -0,0 +1,133 @@
+"""
+Native async versions of the hot read-only catalog endpoints.
+
+Under ASGI every DRF view runs in a worker thread via sync_to_async. These
+views use the async ORM directly, so one ASGI worker can serve many
+concurrent catalog reads without a thread per request. They return the same
+shapes as their DRF counterparts:
+
+    /api/async/modules/              ModuleViewSet list with ?view=outline
+    /api/async/lessons/<id>/         LessonViewSet retrieve
+    /api/async/progress/summary/     UserProgressViewSet summary
+"""
+from collections import defaultdict
+
+from django.db.models import Count
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .models import Module, Lesson, UserProgress, CodeSnippet, Quiz
+from . import queries
+from .views import query_flag
+
+
+def format_datetime(value):
+    # Same ISO 8601 format as DRF's DateTimeField
+    text = value.isoformat()
+    if text.endswith('+00:00'):
+        text = text[:-6] + 'Z'
+    return text
+
+
+def progress_data(progress):
+    if progress is None:
+        return None
+    return {
+        'completed': progress.completed,
+        'exercise_completed': progress.exercise_completed,
+        'time_spent_seconds': progress.time_spent_seconds,
+        'last_accessed': format_datetime(progress.last_accessed)
+    }
+
+
+@require_GET
+async def module_list(request):
+    """Module catalog outline: modules with lightweight lesson entries"""
+    lessons_by_module = defaultdict(list)
+    lessons = Lesson.objects.order_by('module_id', 'order').values(
+        'id', 'module_id', 'title', 'slug', 'order', 'has_exercise'
+    ).annotate(
+        quiz_count=Count('quizzes', distinct=True),
+        snippet_count=Count('snippets', distinct=True)
+    )
+    async for lesson in lessons.aiterator():
+        lessons_by_module[lesson.pop('module_id')].append(lesson)
+
+    modules = []
+    async for module in Module.objects.order_by('order').values(
+        'id', 'title', 'slug', 'description', 'order',
+        'estimated_minutes', 'dotnet_comparison'
+    ).aiterator():
+        module['lessons'] = lessons_by_module.get(module['id'], [])
+        module['total_lessons'] = len(module['lessons'])
+        modules.append(module)
+
+    return JsonResponse(modules, safe=False)
+
+
+@require_GET
+async def lesson_detail(request, pk):
+    """
+    Lesson with its snippets and quizzes
+
+    Honours ?include_progress=false and ?html=true like the DRF endpoint.
+    """
+    try:
+        lesson = await Lesson.objects.aget(pk=pk)
+    except Lesson.DoesNotExist:
+        raise Http404('No Lesson matches the given query.')
+
+    data = {
+        'id': lesson.id,
+        'title': lesson.title,
+        'slug': lesson.slug,
+        'content': lesson.content,
+        'order': lesson.order,
+        'django_code': lesson.django_code,
+        'dotnet_code': lesson.dotnet_code,
+        'has_exercise': lesson.has_exercise,
+        'exercise_starter_code': lesson.exercise_starter_code,
+        'exercise_solution': lesson.exercise_solution,
+        'exercise_tests': lesson.exercise_tests,
+    }
+    if query_flag(request, 'html', False):
+        data.update(
+            content_html=lesson.content_html,
+            django_code_html=lesson.django_code_html,
+            dotnet_code_html=lesson.dotnet_code_html
+        )
+
+    data['snippets'] = [
+        snippet async for snippet in CodeSnippet.objects.filter(lesson=lesson).values(
+            'id', 'title', 'language', 'code', 'description'
+        )
+    ]
+    # correct_answer and explanation are write-only, as in QuizSerializer
+    data['quizzes'] = [
+        quiz async for quiz in Quiz.objects.filter(lesson=lesson).values(
+            'id', 'question', 'options', 'order'
+        )
+    ]
+
+    if query_flag(request, 'include_progress', True):
+        user = await request.auser()
+        progress = None
+        if user.is_authenticated:
+            progress = await UserProgress.objects.filter(user=user, lesson=lesson).afirst()
+        data['is_completed'] = bool(progress and progress.completed)
+        data['progress'] = progress_data(progress)
+
+    return JsonResponse(data)
+
+
+@require_GET
+async def progress_summary(request):
+    """Get overall progress summary"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=403
+        )
+
+    return JsonResponse(queries.progress_summary(await queries.aprogress_by_module(user)))
@@ -0,0 +1,129 @@
+"""
+Compiled content bundle.
+
+build_content_bundle runs the Python content modules once and writes the
+course (lessons.content.load_course) to a single file:
+
+    {"format": 2, "hash": "<sha256 of the payload>", ...}\\n
+    <payload: the course as canonical JSON>
+
+The header is one short line, so a consumer can compare the hash with the
+content it last applied and skip the load entirely without decoding the
+payload. ContentBundle memory-maps the file and decodes the payload only
+when it's asked for the course.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from functools import cached_property
+
+from django.conf import settings
+
+BUNDLE_FORMAT = 2
+
+
+class BundleError(Exception):
+    """A bundle is missing, from another format version, or corrupt"""
+
+
+def bundle_path():
+    default = os.path.join(os.path.dirname(__file__), 'content', 'course.bundle')
+    return str(getattr(settings, 'CONTENT_BUNDLE_PATH', default))
+
+
+def encode_course(course):
+    """Canonical JSON, so the same content always hashes the same"""
+    return json.dumps(course, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_bundle(course, path=None):
+    """Compile course into a bundle at path; returns the header"""
+    path = path or bundle_path()
+    payload = encode_course(course)
+    header = {
+        'format': BUNDLE_FORMAT,
+        'hash': hashlib.sha256(payload).hexdigest(),
+        'length': len(payload),
+        'modules': len(course),
+        'lessons': sum(len(module['lessons']) for module in course),
+    }
+    # Write to a temporary file and rename, so readers never see half a bundle
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bundle-')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(json.dumps(header).encode('utf-8') + b'\n')
+            output.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return header
+
+
+def source_changed_since(path=None):
+    """True if a file in lessons/content is newer than the bundle (or there's no bundle)"""
+    path = path or bundle_path()
+    try:
+        built = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return True
+    source_dir = os.path.join(os.path.dirname(__file__), 'content')
+    return any(
+        entry.stat().st_mtime > built
+        for entry in os.scandir(source_dir)
+        if entry.name.endswith('.py')
+    )
+
+
+class ContentBundle:
+    """A memory-mapped bundle; use as a context manager or call close()"""
+
+    def __init__(self, path=None):
+        self.path = path or bundle_path()
+        try:
+            with open(self.path, 'rb') as bundle_file:
+                self._map = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as e:
+            # ValueError: an empty file can't be mapped
+            raise BundleError(f'Cannot open content bundle {self.path}: {e}')
+
+        try:
+            self.header = json.loads(self._map.readline())
+        except ValueError:
+            self.close()
+            raise BundleError(f'{self.path} is not a content bundle')
+        if self.header.get('format') != BUNDLE_FORMAT:
+            self.close()
+            raise BundleError(
+                f"{self.path} is bundle format {self.header.get('format')}, expected {BUNDLE_FORMAT}; rebuild it"
+            )
+        self._offset = self._map.tell()
+
+    @property
+    def hash(self):
+        return self.header['hash']
+
+    @cached_property
+    def course(self):
+        """Verify and decode the payload"""
+        payload = memoryview(self._map)[self._offset:]
+        try:
+            if (len(payload) != self.header['length']
+                    or hashlib.sha256(payload).hexdigest() != self.hash):
+                raise BundleError(f'{self.path} is corrupt: its payload does not match its hash')
+            return json.loads(payload.tobytes())
+        finally:
+            payload.release()
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
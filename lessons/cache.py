@@ -0,0 +1,103 @@
+"""
+Shared cache for the anonymous course catalog.
+
+Catalog responses are cached as rendered JSON bytes under a key that includes
+a content version. Saving or deleting a Module, Lesson, Quiz or CodeSnippet
+bumps the version (see the signal receivers in models.py), so stale entries
+are never read again and simply expire.
+
+The version is a random token in the CatalogVersion row, written in the same
+transaction as the content change, so every process (other web workers,
+populate_tutorial) agrees on it whatever the cache backend. Each process
+re-reads it at most every LESSONS_CATALOG_VERSION_CHECK_SECONDS. Tokens are
+never reused, so a rolled-back change can't make an old snapshot look current.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'LESSONS_CATALOG_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# (version, time.monotonic() when it was read) for this process, and when
+# this process last bumped the version
+_checked = None
+_bumped_at = 0.0
+_checked_lock = threading.Lock()
+
+
+def version_check_interval():
+    return getattr(settings, 'LESSONS_CATALOG_VERSION_CHECK_SECONDS', 1)
+
+
+def get_catalog_version():
+    """Return the current catalog content version"""
+    global _checked
+    checked = _checked
+    if checked is not None and time.monotonic() - checked[1] < version_check_interval():
+        return checked[0]
+
+    from .models import CatalogVersion
+    read_at = time.monotonic()
+    version = CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+    if version is None:
+        version = bump_catalog_version()
+    with _checked_lock:
+        # A reading taken before this process's own bump may already be stale
+        if read_at > _bumped_at and (_checked is None or _checked[1] < read_at):
+            _checked = (version, read_at)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response and in-process catalog snapshot"""
+    global _checked, _bumped_at
+    from .models import CatalogVersion
+    version = uuid.uuid4().hex
+    if not CatalogVersion.objects.filter(pk=1).update(version=version):
+        CatalogVersion.objects.get_or_create(pk=1, defaults={'version': version})
+    with _checked_lock:
+        # Read it back next time: the change may yet roll back
+        _checked = None
+        _bumped_at = time.monotonic()
+    return version
+
+
+def catalog_cache_key(name, version=None):
+    if version is None:
+        version = get_catalog_version()
+    return f'lessons:catalog:{version}:{name}'
+
+
+def cached_catalog_response(request, name, render):
+    """
+    Serve a catalog response from the shared cache.
+
+    ``render`` is only called on a miss and must return the JSON body as bytes.
+    Requests whose If-None-Match matches the cached ETag get a 304.
+    """
+    key = catalog_cache_key(name)
+    entry = cache.get(key)
+    if entry is None:
+        content = render()
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        entry = (etag, content)
+        cache.set(key, entry, CATALOG_CACHE_TIMEOUT)
+
+    etag, content = entry
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if '*' in etags or etag in etags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    return response
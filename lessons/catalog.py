@@ -0,0 +1,127 @@
+"""
+In-process snapshot of the course catalog.
+
+The catalog (modules, lessons, snippets, quizzes) is small and changes
+rarely, so each process keeps an immutable copy and reads it with no
+queries. get_catalog() checks the catalog version (lessons/cache.py, read
+from the database so content changes made by any process are seen) and,
+when it has moved on, builds a new snapshot with four queries and
+swaps it in with a single reference assignment. Requests already holding the
+old snapshot finish with it undisturbed.
+
+Records use __slots__ and the same attribute names as the models, so the
+catalog serializers render them unchanged.
+"""
+import threading
+from collections import defaultdict
+
+from .cache import get_catalog_version
+from .models import Module, Lesson, CodeSnippet, Quiz
+
+
+class Record:
+    """Compact read-only record; subclasses list their fields in __slots__"""
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} records are read-only')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.id}>'
+
+
+class ModuleRecord(Record):
+    __slots__ = ('id', 'title', 'slug', 'description', 'order', 'estimated_minutes',
+                 'dotnet_comparison', 'lessons', 'lesson_count')
+
+
+class LessonRecord(Record):
+    __slots__ = ('id', 'module_id', 'title', 'slug', 'content', 'order',
+                 'django_code', 'dotnet_code', 'has_exercise',
+                 'exercise_starter_code', 'exercise_solution', 'exercise_tests', 'exercise_models',
+                 'content_html', 'django_code_html', 'dotnet_code_html',
+                 'snippets', 'quizzes', 'snippet_count', 'quiz_count')
+
+
+class SnippetRecord(Record):
+    __slots__ = ('id', 'lesson_id', 'title', 'language', 'code', 'description')
+
+
+class QuizRecord(Record):
+    __slots__ = ('id', 'lesson_id', 'question', 'options', 'correct_answer', 'explanation', 'order')
+
+
+def field_names(record_class, exclude=()):
+    return [name for name in record_class.__slots__ if name not in exclude]
+
+
+class CatalogSnapshot:
+    """Every module, lesson, snippet and quiz at one catalog version"""
+
+    def __init__(self, version, modules):
+        self.version = version
+        self.modules = tuple(modules)
+        self.modules_by_id = {module.id: module for module in self.modules}
+        self.modules_by_slug = {module.slug: module for module in self.modules}
+        self.lessons = tuple(lesson for module in self.modules for lesson in module.lessons)
+        self.lessons_by_id = {lesson.id: lesson for lesson in self.lessons}
+        self.lessons_by_slug = {
+            (self.modules_by_id[lesson.module_id].slug, lesson.slug): lesson
+            for lesson in self.lessons
+        }
+        self.quizzes_by_id = {quiz.id: quiz for lesson in self.lessons for quiz in lesson.quizzes}
+
+    @classmethod
+    def build(cls, version):
+        snippets = defaultdict(list)
+        for row in CodeSnippet.objects.values(*field_names(SnippetRecord)).order_by('id'):
+            snippets[row['lesson_id']].append(SnippetRecord(**row))
+
+        quizzes = defaultdict(list)
+        for row in Quiz.objects.values(*field_names(QuizRecord)).order_by('order', 'id'):
+            row['options'] = tuple(row['options'])
+            quizzes[row['lesson_id']].append(QuizRecord(**row))
+
+        lessons = defaultdict(list)
+        lesson_fields = field_names(LessonRecord, exclude=('snippets', 'quizzes', 'snippet_count', 'quiz_count'))
+        for row in Lesson.objects.values(*lesson_fields).order_by('order', 'id'):
+            lesson_snippets = tuple(snippets.get(row['id'], ()))
+            lesson_quizzes = tuple(quizzes.get(row['id'], ()))
+            lessons[row['module_id']].append(LessonRecord(
+                **row,
+                snippets=lesson_snippets,
+                quizzes=lesson_quizzes,
+                snippet_count=len(lesson_snippets),
+                quiz_count=len(lesson_quizzes)
+            ))
+
+        modules = []
+        module_fields = field_names(ModuleRecord, exclude=('lessons', 'lesson_count'))
+        for row in Module.objects.values(*module_fields).order_by('order', 'id'):
+            module_lessons = tuple(lessons.get(row['id'], ()))
+            modules.append(ModuleRecord(**row, lessons=module_lessons, lesson_count=len(module_lessons)))
+        return cls(version, modules)
+
+
+_snapshot = None
+_build_lock = threading.Lock()
+
+
+def get_catalog():
+    """The catalog snapshot for the current content version, rebuilt if it's out of date"""
+    global _snapshot
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _build_lock:
+        # Another thread may have built it while this one waited
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = CatalogSnapshot.build(version)
+            _snapshot = snapshot
+    return snapshot
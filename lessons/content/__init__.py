@@ -0,0 +1,95 @@
+"""
+Tutorial content, as plain data.
+
+load_course() assembles course.py and the moduleN_content.py files into a
+list of modules, each with its lessons and each lesson with its quizzes,
+using the field names of the Module, Lesson and Quiz models. Lessons are
+identified by (module slug, lesson slug) and quizzes by their order within
+a lesson.
+
+Building the course runs the content modules, so consumers read the
+compiled bundle instead (see lessons/bundle.py); only load_course() imports
+them.
+"""
+import json
+
+MODULE_FIELDS = ['title', 'description', 'order', 'estimated_minutes', 'dotnet_comparison']
+LESSON_FIELDS = [
+    'title', 'order', 'content', 'django_code', 'dotnet_code', 'has_exercise',
+    'exercise_starter_code', 'exercise_solution', 'exercise_tests', 'exercise_models',
+]
+QUIZ_FIELDS = ['question', 'options', 'correct_answer', 'explanation']
+
+
+def lesson_record(lesson_data, exercise=None):
+    record = {
+        'slug': lesson_data['slug'],
+        'title': lesson_data['title'],
+        'order': lesson_data.get('order', 0),
+        'content': lesson_data.get('content', ''),
+        'django_code': lesson_data.get('django_code', ''),
+        'dotnet_code': lesson_data.get('dotnet_code', ''),
+        'has_exercise': lesson_data.get('has_exercise', False),
+        'exercise_starter_code': lesson_data.get('exercise_starter_code', ''),
+        'exercise_solution': lesson_data.get('exercise_solution', ''),
+        'exercise_tests': lesson_data.get('exercise_tests', ''),
+        'exercise_models': lesson_data.get('exercise_models', ''),
+        'quizzes': [],
+    }
+    if exercise:
+        record.update(
+            has_exercise=True,
+            exercise_starter_code=exercise['starter_code'],
+            exercise_solution=exercise['solution'],
+            exercise_tests=json.dumps(exercise['tests']),
+            exercise_models=exercise.get('models', '')
+        )
+    return record
+
+
+def load_course():
+    """The whole course: [{module fields, 'lessons': [{lesson fields, 'quizzes': [...]}]}]"""
+    from .course import get_modules, get_lessons, get_quizzes
+    from .module1_content import get_module1_lessons, get_module1_exercises
+    from .module2_content import get_module2_lessons, get_module2_exercises
+    from .module3_content import get_module3_lessons, get_module3_exercises
+    from .module4_content import get_module4_lessons
+    from .module5_content import get_module5_lessons
+
+    # Module slug -> (lessons, exercises) from the moduleN_content.py files
+    module_content = {
+        'django-fundamentals': (get_module1_lessons, get_module1_exercises),
+        'django-rest-framework': (get_module2_lessons, get_module2_exercises),
+        'async-background-tasks': (get_module3_lessons, get_module3_exercises),
+        'llm-proxy': (get_module4_lessons, list),
+        'docker-deployment': (get_module5_lessons, list),
+    }
+
+    modules = []
+    lessons = {}
+    for module_data in get_modules():
+        module = {'slug': module_data['slug'], **{f: module_data[f] for f in MODULE_FIELDS}, 'lessons': []}
+        modules.append(module)
+
+        # Lessons in course.py come first and take precedence
+        for lesson_data in get_lessons():
+            if lesson_data['module_slug'] == module['slug']:
+                lessons[module['slug'], lesson_data['slug']] = lesson_record(lesson_data)
+
+        get_content_lessons, get_exercises = module_content.get(module['slug'], (list, list))
+        exercises = {exercise['lesson_slug']: exercise for exercise in get_exercises()}
+        for lesson_data in get_content_lessons():
+            key = (module['slug'], lesson_data['slug'])
+            if key not in lessons:
+                lessons[key] = lesson_record(lesson_data, exercises.get(lesson_data['slug']))
+
+        module['lessons'] = sorted(
+            (lesson for (module_slug, _), lesson in lessons.items() if module_slug == module['slug']),
+            key=lambda lesson: lesson['order']
+        )
+
+    for quiz in get_quizzes():
+        lessons[quiz['module_slug'], quiz['lesson_slug']]['quizzes'].append(
+            {'order': quiz['order'], **{f: quiz[f] for f in QUIZ_FIELDS}}
+        )
+    return modules
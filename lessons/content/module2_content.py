@@ -270,6 +270,14 @@ class BookSerializer(serializers.ModelSerializer):
     def get_is_recent(self, obj):
         two_years_ago = date.today() - timedelta(days=730)
         return obj.publication_date >= two_years_ago
+''',
+            'models': '''from django.db import models
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    author = models.CharField(max_length=200)
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    publication_date = models.DateField()
 ''',
             'tests': [
                 {
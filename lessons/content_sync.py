@@ -0,0 +1,184 @@
+"""
+Apply the tutorial content (lessons/content) to the database.
+
+sync_course() diffs the content against the current rows, matching modules
+by slug, lessons by (module slug, lesson slug) and quizzes by (module slug,
+lesson slug, order). It writes only what changed with bulk_create and
+bulk_update in one transaction, so re-running it is cheap and safe. Bulk
+writes skip model signals, so it renders lesson HTML, bumps the catalog
+version and refreshes the ModuleProgress rollups itself.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .content import LESSON_FIELDS, MODULE_FIELDS, QUIZ_FIELDS
+from .models import Module, Lesson, Quiz
+from .progress import refresh_module_progress
+
+# action is 'create', 'update', 'delete' or 'outdated' (differs, but update=False)
+Change = namedtuple('Change', ['action', 'kind', 'key', 'fields'])
+
+HTML_SOURCES = {'content', 'django_code', 'dotnet_code'}
+
+
+def diff_fields(instance, data, fields):
+    return [field for field in fields if getattr(instance, field) != data[field]]
+
+
+class CourseSync:
+    def __init__(self, course, update, prune):
+        self.course = course
+        self.update = update
+        self.prune = prune
+        self.changes = []
+        self.now = timezone.now()
+
+    def record(self, action, kind, key, fields=()):
+        # Module keys are bare slugs; lesson and quiz keys are tuples
+        parts = key if isinstance(key, tuple) else (key,)
+        self.changes.append(Change(action, kind, '/'.join(str(part) for part in parts), list(fields)))
+
+    def reconcile(self, kind, existing, key, data, fields, build):
+        """Compare one content item with its row; returns (new row or None, updated row or None)"""
+        instance = existing.pop(key, None)
+        if instance is None:
+            self.record('create', kind, key)
+            return build(), None
+        changed = diff_fields(instance, data, fields)
+        if not changed:
+            return None, None
+        if not self.update:
+            self.record('outdated', kind, key, changed)
+            return None, None
+        for field in changed:
+            setattr(instance, field, data[field])
+        self.record('update', kind, key, changed)
+        return None, (instance, changed)
+
+    def run(self):
+        modules = {module.slug: module for module in Module.objects.all()}
+        module_slugs = {module.id: slug for slug, module in modules.items()}
+        lessons = {
+            (module_slugs[lesson.module_id], lesson.slug): lesson
+            for lesson in Lesson.objects.all()
+        }
+        lesson_keys = {lesson.id: key for key, lesson in lessons.items()}
+        quizzes = {}
+        duplicate_quizzes = []
+        for quiz in Quiz.objects.order_by('id'):
+            key = (*lesson_keys[quiz.lesson_id], quiz.order)
+            if key in quizzes:
+                duplicate_quizzes.append(quiz)
+            else:
+                quizzes[key] = quiz
+
+        module_rows = self.sync_modules(modules)
+        lesson_rows, new_lesson_modules = self.sync_lessons(lessons, module_rows)
+        self.sync_quizzes(quizzes, duplicate_quizzes, lesson_rows)
+
+        if new_lesson_modules:
+            refresh_module_progress(module_ids=new_lesson_modules)
+        if self.prune:
+            # Deleting goes through the ORM so progress rows cascade and the
+            # Lesson post_delete receiver refreshes the rollups
+            leftover_quizzes = [quiz.id for quiz in [*quizzes.values(), *duplicate_quizzes]]
+            Quiz.objects.filter(id__in=leftover_quizzes).delete()
+            Lesson.objects.filter(id__in=[lesson.id for lesson in lessons.values()]).delete()
+            Module.objects.filter(id__in=[module.id for module in modules.values()]).delete()
+            for kind, leftovers in (('quiz', quizzes), ('lesson', lessons), ('module', modules)):
+                for key in leftovers:
+                    self.record('delete', kind, key)
+            for quiz in duplicate_quizzes:
+                self.record('delete', 'quiz', (*lesson_keys[quiz.lesson_id], quiz.order), ['duplicate'])
+        return self.changes
+
+    def sync_modules(self, modules):
+        created, updated = [], []
+        rows = {}
+        for data in self.course:
+            slug = data['slug']
+            existing = modules.get(slug)
+            new, changed = self.reconcile(
+                'module', modules, slug, data, MODULE_FIELDS,
+                lambda: Module(slug=slug, **{field: data[field] for field in MODULE_FIELDS})
+            )
+            if new:
+                created.append(new)
+            if changed:
+                updated.append(changed[0])
+            rows[slug] = new or existing
+
+        Module.objects.bulk_create(created)
+        for module in updated:
+            module.updated_at = self.now
+        Module.objects.bulk_update(updated, [*MODULE_FIELDS, 'updated_at'])
+        return rows
+
+    def sync_lessons(self, lessons, module_rows):
+        created, updated = [], []
+        rows = {}
+        for module_data in self.course:
+            module = module_rows[module_data['slug']]
+            for data in module_data['lessons']:
+                key = (module_data['slug'], data['slug'])
+                existing = lessons.get(key)
+                new, changed = self.reconcile(
+                    'lesson', lessons, key, data, LESSON_FIELDS,
+                    lambda: Lesson(module=module, slug=data['slug'], **{field: data[field] for field in LESSON_FIELDS})
+                )
+                if new:
+                    new.render_html()
+                    created.append(new)
+                if changed:
+                    lesson, fields = changed
+                    if HTML_SOURCES.intersection(fields):
+                        lesson.render_html()
+                    updated.append(lesson)
+                rows[key] = new or existing
+
+        Lesson.objects.bulk_create(created)
+        for lesson in updated:
+            lesson.updated_at = self.now
+        Lesson.objects.bulk_update(updated, [*LESSON_FIELDS, *Lesson.RENDERED_FIELDS, 'updated_at'])
+        return rows, {lesson.module_id for lesson in created}
+
+    def sync_quizzes(self, quizzes, duplicate_quizzes, lesson_rows):
+        created, updated = [], []
+        for module_data in self.course:
+            for lesson_data in module_data['lessons']:
+                lesson = lesson_rows[module_data['slug'], lesson_data['slug']]
+                for data in lesson_data['quizzes']:
+                    key = (module_data['slug'], lesson_data['slug'], data['order'])
+                    new, changed = self.reconcile(
+                        'quiz', quizzes, key, data, QUIZ_FIELDS,
+                        lambda: Quiz(lesson=lesson, order=data['order'], **{field: data[field] for field in QUIZ_FIELDS})
+                    )
+                    if new:
+                        created.append(new)
+                    if changed:
+                        updated.append(changed[0])
+
+        Quiz.objects.bulk_create(created)
+        Quiz.objects.bulk_update(updated, QUIZ_FIELDS)
+
+
+def sync_course(course, update=True, prune=False, dry_run=False):
+    """
+    Bring the database in line with course (see lessons.content.load_course).
+
+    With update=False, existing rows are left alone and differences are
+    reported as 'outdated'. prune deletes modules, lessons and quizzes that
+    aren't in the content, along with their progress. dry_run rolls
+    everything back. Returns the list of Changes.
+    """
+    with transaction.atomic():
+        changes = CourseSync(course, update, prune).run()
+        if dry_run:
+            transaction.set_rollback(True)
+        elif any(change.action != 'outdated' for change in changes):
+            # Bulk writes skip the model signals
+            bump_catalog_version()
+    return changes
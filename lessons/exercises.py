@@ -0,0 +1,212 @@
+"""
+Exercise grading shared by the API views and the Celery tasks.
+"""
+import copy
+import hashlib
+import json
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .progress import buffer_progress
+from .sandbox import run_tests
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of grading results.
+    
+    Grading is a pure function of the code and the tests, so identical
+    submissions (starter code, the reference solution) can skip the runner.
+    Keys include a hash of the tests and models stub, so editing a lesson's
+    exercise makes its old entries unreachable and they age out.
+    """
+    
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(code, tests_json, models=''):
+        # Line endings and trailing whitespace don't change what the code does
+        normalized = code.replace('\r\n', '\n').rstrip()
+        return '%s:%s' % (
+            hashlib.sha256(f'{tests_json}\0{models}'.encode()).hexdigest(),
+            hashlib.sha256(normalized.encode()).hexdigest(),
+        )
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(self._entries[key])
+    
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+result_cache = ResultCache(getattr(settings, 'EXERCISE_RESULT_CACHE_SIZE', 1024))
+
+
+def run_exercise_tests(code, tests_json, pool=None, on_test=None, models=''):
+    """
+    Run tests on submitted code
+    
+    on_test, if given, is called as on_test(index, result) once per test, as
+    soon as that test's result is known. models is the lesson's
+    exercise_models stub.
+    """
+    if not tests_json:
+        return {'all_passed': True, 'results': [], 'message': 'No tests defined'}
+    
+    try:
+        tests = json.loads(tests_json)
+    except json.JSONDecodeError:
+        return {'all_passed': False, 'error': 'Invalid test configuration'}
+    
+    cache_key = result_cache.key(code, tests_json, models)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        if on_test is not None:
+            for i, result in enumerate(cached['results']):
+                on_test(i, result)
+        return cached
+    
+    reported = set()
+    
+    def report_test(report):
+        reported.add(report['index'])
+        on_test(report['index'], test_result(report['index'], tests[report['index']], report, None))
+    
+    try:
+        # Run the code in a warm sandbox runner; each test is reported separately
+        run = run_tests(code, tests, pool=pool, on_test=report_test if on_test else None, models=models)
+    except Exception as e:
+        # Runner failures depend on load, so they aren't cached
+        return {'all_passed': False, 'results': [{'passed': False, 'error': str(e)}]}
+    
+    reports = {report['index']: report for report in run.tests}
+    results = [
+        test_result(i, test, reports.get(i), run)
+        for i, test in enumerate(tests)
+    ]
+    all_passed = all(result['passed'] for result in results)
+    
+    if on_test is not None:
+        # Tests the runner never reported (timeouts, crashes, no streaming)
+        for i, result in enumerate(results):
+            if i not in reported:
+                on_test(i, result)
+    
+    test_results = {
+        'all_passed': all_passed,
+        'results': results,
+        'duration_ms': round(sum(result.get('duration_ms', 0) for result in results), 3)
+    }
+    # Timeouts (of the run or of any one test) depend on load, so they aren't cached
+    if not run.timed_out and not any(report.get('timed_out') for report in run.tests):
+        result_cache.set(cache_key, test_results)
+    return test_results
+
+
+def test_result(index, test, report, run):
+    """Shape one test's runner report for the API response"""
+    result = {
+        'test': test.get('description', f'Test {index+1}'),
+        'passed': False,
+        'expected': str(test.get('expected', '')),
+        'actual': ''
+    }
+    if report is None:
+        # The run ended before this test could report
+        if run.timed_out:
+            result['error'] = 'Code execution timed out'
+        else:
+            result['error'] = run.stderr or 'Test did not run'
+        return result
+    
+    result.update(
+        passed=report['passed'],
+        actual=report['actual'],
+        duration_ms=report['duration_ms']
+    )
+    if report['exception']:
+        result['error'] = report['exception']
+    return result
+
+
+def stream_exercise_tests(code, tests_json, pool=None, models=''):
+    """
+    Grade a submission in the background, yielding ('test', result) for each
+    test as it finishes and then ('summary', test_results).
+    """
+    events = queue.Queue()
+    
+    def on_test(index, result):
+        events.put(('test', {'index': index, **result}))
+    
+    def grade():
+        try:
+            test_results = run_exercise_tests(code, tests_json, pool, on_test, models)
+        except Exception as e:
+            test_results = {'all_passed': False, 'results': [{'passed': False, 'error': str(e)}]}
+        events.put(('summary', test_results))
+    
+    threading.Thread(target=grade, daemon=True).start()
+    while True:
+        event, data = events.get()
+        yield event, data
+        if event == 'summary':
+            return
+
+
+def grade_many(submissions, workers=None, pool=None):
+    """
+    Grade many (lesson, code) pairs in parallel, yielding
+    (index, lesson, results) in the order they finish.
+    
+    Each thread blocks on a sandbox runner, so there is no point in running
+    more threads than the pool has runners. Lessons must already be loaded;
+    the threads don't touch the database.
+    """
+    if workers is None:
+        workers = pool.size if pool else getattr(settings, 'EXERCISE_POOL_SIZE', 2)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = {
+            executor.submit(
+                run_exercise_tests, code, lesson.exercise_tests, pool, models=lesson.exercise_models
+            ): (index, lesson)
+            for index, (lesson, code) in enumerate(submissions)
+        }
+        for future in as_completed(futures):
+            index, lesson = futures[future]
+            yield index, lesson, future.result()
+    finally:
+        # Stop queued grading if the consumer goes away (e.g. client disconnect)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def record_exercise_attempt(user, lesson, code, test_results):
+    """Record one graded submission against the user's progress (write-behind)"""
+    buffer_progress(
+        user, lesson.id,
+        exercise_attempts=1,
+        exercise_code=code,
+        exercise_completed=test_results['all_passed']
+    )
@@ -0,0 +1,177 @@
+"""
+Streaming progress exports.
+
+Rows are read with select_related (or joined values_list columns) and
+.iterator(), so each row needs no further queries. The iterator uses
+server-side cursors where the database supports them. The queryset is never
+cached, so memory stays flat however long the history is.
+
+jsonl_lines() is one learner's export, in the same shape as the
+/api/export-progress/ document. The CSV datasets (progress, quiz attempts and
+per-lesson totals) cover whole cohorts, for the export_cohort command and
+the admin export actions.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Lesson, UserProgress, UserQuizAttempt
+from .serializers import UserProgressSerializer
+
+QUIZ_ATTEMPT_FIELDS = ['quiz_id', 'selected_answer', 'is_correct', 'attempted_at']
+
+
+def chunk_size():
+    return getattr(settings, 'PROGRESS_EXPORT_CHUNK_SIZE', 2000)
+
+
+def progress_records(users):
+    """UserProgressSerializer data for every progress row of users (a queryset or list)"""
+    # One serializer instance is reused for every row
+    serializer = UserProgressSerializer()
+    rows = UserProgress.objects.filter(user__in=users).select_related(
+        'lesson__module'
+    ).order_by('user_id', 'id')
+    for progress in rows.iterator(chunk_size=chunk_size()):
+        yield progress.user_id, serializer.to_representation(progress)
+
+
+def quiz_attempt_records(users):
+    rows = UserQuizAttempt.objects.filter(user__in=users).order_by('user_id', 'id').values(
+        'user_id', *QUIZ_ATTEMPT_FIELDS
+    )
+    for attempt in rows.iterator(chunk_size=chunk_size()):
+        yield attempt.pop('user_id'), attempt
+
+
+def jsonl_lines(user):
+    """
+    One user's progress export as JSON Lines:
+
+        {"type": "user", "user": "<username>"}
+        {"type": "progress", ...}        one per UserProgress row
+        {"type": "quiz_attempt", ...}    one per UserQuizAttempt
+    """
+    encoder = JSONEncoder()
+    username = user.username if user.is_authenticated else 'anonymous'
+    yield encoder.encode({'type': 'user', 'user': username}) + '\n'
+    if not user.is_authenticated:
+        return
+    for _, record in progress_records([user.id]):
+        yield encoder.encode({'type': 'progress', **record}) + '\n'
+    for _, record in quiz_attempt_records([user.id]):
+        yield encoder.encode({'type': 'quiz_attempt', **record}) + '\n'
+
+
+# (CSV column, values_list lookup)
+PROGRESS_CSV_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('module', 'lesson__module__slug'),
+    ('lesson_id', 'lesson_id'),
+    ('lesson', 'lesson__slug'),
+    ('completed', 'completed'),
+    ('completed_at', 'completed_at'),
+    ('exercise_completed', 'exercise_completed'),
+    ('exercise_attempts', 'exercise_attempts'),
+    ('time_spent_seconds', 'time_spent_seconds'),
+    ('last_accessed', 'last_accessed'),
+]
+
+QUIZ_ATTEMPT_CSV_COLUMNS = [
+    ('attempt_id', 'id'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('lesson_id', 'quiz__lesson_id'),
+    ('quiz_id', 'quiz_id'),
+    ('selected_answer', 'selected_answer'),
+    ('is_correct', 'is_correct'),
+    ('attempted_at', 'attempted_at'),
+]
+
+LESSON_CSV_HEADER = [
+    'module', 'lesson_id', 'lesson', 'learners', 'completed',
+    'time_spent_seconds', 'average_time_seconds', 'quiz_attempts', 'quiz_correct',
+]
+
+
+def csv_rows(queryset, columns):
+    return queryset.order_by('id').values_list(
+        *[lookup for _, lookup in columns]
+    ).iterator(chunk_size=chunk_size())
+
+
+def progress_csv(queryset=None):
+    """Header and rows for one line per UserProgress row"""
+    if queryset is None:
+        queryset = UserProgress.objects.all()
+    return [name for name, _ in PROGRESS_CSV_COLUMNS], csv_rows(queryset, PROGRESS_CSV_COLUMNS)
+
+
+def quiz_attempt_csv(queryset=None):
+    """Header and rows for one line per UserQuizAttempt"""
+    if queryset is None:
+        queryset = UserQuizAttempt.objects.all()
+    return [name for name, _ in QUIZ_ATTEMPT_CSV_COLUMNS], csv_rows(queryset, QUIZ_ATTEMPT_CSV_COLUMNS)
+
+
+def lesson_csv():
+    """Header and rows for per-lesson totals across all learners"""
+    return LESSON_CSV_HEADER, lesson_rows()
+
+
+def lesson_rows():
+    # Progress and quiz totals are grouped separately; joining both to
+    # Lesson in one query would multiply the rows being summed
+    quiz_totals = {
+        row['quiz__lesson_id']: row
+        for row in UserQuizAttempt.objects.order_by().values('quiz__lesson_id').annotate(
+            attempts=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+        )
+    }
+    progress_totals = {
+        row['lesson_id']: row
+        for row in UserProgress.objects.order_by().values('lesson_id').annotate(
+            learners=Count('id'),
+            completed=Count('id', filter=Q(completed=True)),
+            time=Sum('time_spent_seconds')
+        )
+    }
+    lessons = Lesson.objects.order_by('module__order', 'order').values_list('id', 'module__slug', 'slug')
+    for lesson_id, module_slug, slug in lessons:
+        progress = progress_totals.get(lesson_id, {})
+        quizzes = quiz_totals.get(lesson_id, {})
+        learners = progress.get('learners', 0)
+        time = progress.get('time') or 0
+        yield (
+            module_slug, lesson_id, slug, learners, progress.get('completed', 0),
+            time, round(time / learners) if learners else 0,
+            quizzes.get('attempts', 0), quizzes.get('correct', 0),
+        )
+
+
+CSV_DATASETS = {
+    'progress': progress_csv,
+    'quiz_attempts': quiz_attempt_csv,
+    'lessons': lesson_csv,
+}
+
+
+def csv_chunks(header, rows):
+    """Encode rows as CSV text, a few thousand rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    rows = iter(rows)
+    while True:
+        writer.writerows(islice(rows, chunk_size()))
+        chunk = buffer.getvalue()
+        if not chunk:
+            return
+        yield chunk
+        buffer.seek(0)
+        buffer.truncate()
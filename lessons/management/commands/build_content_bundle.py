@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from lessons.bundle import bundle_path, write_bundle
+from lessons.content import load_course
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile the tutorial content (lessons/content) into a versioned, hashed bundle '
+        'that populate_tutorial reads without running the content modules.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Where to write the bundle (default: settings.CONTENT_BUNDLE_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or bundle_path()
+        header = write_bundle(load_course(), path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {path}: {header['modules']} modules, {header['lessons']} lessons, "
+            f"{header['length']} bytes, content hash {header['hash'][:12]}"
+        ))
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from lessons.exercises import grade_many
+from lessons.models import Lesson, UserProgress
+from lessons.sandbox import configured_pool
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = (
+        "Grade exercises in parallel. By default checks that every lesson's "
+        "exercise_solution passes its own exercise_tests; with --regrade, "
+        "re-grades the code users last submitted and updates exercise_completed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lesson', action='append', dest='lessons', default=[], metavar='SLUG',
+            help='Only grade this lesson (may be repeated)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 2,
+            help='Sandbox runners to grade with in parallel (default: CPU count)'
+        )
+        parser.add_argument(
+            '--regrade', action='store_true',
+            help="Re-grade users' saved exercise code instead of the reference solutions"
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print one JSON line per graded submission as it finishes'
+        )
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.filter(has_exercise=True).select_related('module')
+        if options['lessons']:
+            lessons = lessons.filter(slug__in=options['lessons'])
+
+        if options['regrade']:
+            items = list(
+                UserProgress.objects.filter(lesson__in=lessons)
+                .exclude(exercise_code='')
+                .select_related('lesson', 'lesson__module', 'user')
+            )
+            submissions = [(p.lesson, p.exercise_code) for p in items]
+        else:
+            items = [lesson for lesson in lessons if lesson.exercise_solution]
+            submissions = [(lesson, lesson.exercise_solution) for lesson in items]
+
+        if not submissions:
+            self.stdout.write('Nothing to grade.')
+            return
+
+        pool = configured_pool(size=max(1, options['workers']))
+        failures = []
+        changed = []
+        try:
+            for index, lesson, results in grade_many(submissions, pool=pool):
+                item = items[index]
+                label = f'{lesson.module.slug}/{lesson.slug}'
+                if options['regrade']:
+                    label = f'{item.user.username} {label}'
+                    if item.exercise_completed != results['all_passed']:
+                        item.exercise_completed = results['all_passed']
+                        changed.append(item)
+                if not results['all_passed']:
+                    failures.append(label)
+
+                if options['json']:
+                    self.stdout.write(json.dumps({'index': index, 'lesson_id': lesson.id, 'label': label, **results}))
+                elif results['all_passed']:
+                    self.stdout.write(self.style.SUCCESS(f'PASS {label}'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'FAIL {label}'))
+                    for result in results.get('results', []):
+                        if not result.get('passed'):
+                            detail = result.get('error') or (
+                                f"expected {result.get('expected')!r}, got {result.get('actual')!r}"
+                            )
+                            self.stdout.write(f"    {result.get('test', '')}: {detail}")
+        finally:
+            pool.close()
+
+        if options['regrade']:
+            UserProgress.objects.bulk_update(changed, ['exercise_completed'])
+            self.stderr.write(f'Updated exercise_completed on {len(changed)} of {len(submissions)} submissions.')
+            return
+
+        self.stderr.write(f'{len(submissions) - len(failures)} of {len(submissions)} passed.')
+        if failures:
+            raise CommandError(f'{len(failures)} exercise solution(s) failed their tests')
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:13
+
+import markdown
+import nh3
+from django.db import migrations, models
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+# A frozen copy of lessons.rendering as it was when this migration was
+# written, so later changes to the renderer don't change what it does
+
+ALLOWED_ATTRIBUTES = {
+    tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()
+}
+for tag in ('div', 'span', 'pre', 'code', 'table', 'th', 'td'):
+    ALLOWED_ATTRIBUTES.setdefault(tag, set()).add('class')
+
+
+def render_markdown(text):
+    if not text:
+        return ''
+    html = markdown.markdown(
+        text,
+        extensions=['fenced_code', 'tables', 'codehilite'],
+        extension_configs={'codehilite': {'css_class': 'codehilite', 'guess_lang': False}},
+    )
+    return nh3.clean(html, attributes=ALLOWED_ATTRIBUTES)
+
+
+def render_code(code, language):
+    if not code:
+        return ''
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        lexer = get_lexer_by_name('text')
+    return nh3.clean(highlight(code, lexer, HtmlFormatter(nowrap=True)), attributes=ALLOWED_ATTRIBUTES)
+
+
+def render_existing_lessons(apps, schema_editor):
+    Lesson = apps.get_model('lessons', 'Lesson')
+    lessons = list(Lesson.objects.all())
+    for lesson in lessons:
+        lesson.content_html = render_markdown(lesson.content)
+        lesson.django_code_html = render_code(lesson.django_code, 'python')
+        lesson.dotnet_code_html = render_code(lesson.dotnet_code, 'csharp')
+    Lesson.objects.bulk_update(
+        lessons, ['content_html', 'django_code_html', 'dotnet_code_html']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='django_code_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='dotnet_code_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_existing_lessons, migrations.RunPython.noop),
+    ]
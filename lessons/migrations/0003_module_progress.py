@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_module_progress(apps, schema_editor):
+    Lesson = apps.get_model('lessons', 'Lesson')
+    UserProgress = apps.get_model('lessons', 'UserProgress')
+    ModuleProgress = apps.get_model('lessons', 'ModuleProgress')
+    lesson_counts = dict(
+        Lesson.objects.order_by().values('module_id').annotate(count=Count('id'))
+        .values_list('module_id', 'count')
+    )
+    rows = UserProgress.objects.order_by().values('user_id', 'lesson__module_id').annotate(
+        completed=Count('id', filter=Q(completed=True)),
+        time=Sum('time_spent_seconds')
+    )
+    ModuleProgress.objects.bulk_create([
+        ModuleProgress(
+            user_id=row['user_id'],
+            module_id=row['lesson__module_id'],
+            completed_lessons=row['completed'],
+            total_lessons=lesson_counts.get(row['lesson__module_id'], 0),
+            time_spent_seconds=row['time'] or 0
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0002_lesson_rendered_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModuleProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_lessons', models.IntegerField(default=0)),
+                ('total_lessons', models.IntegerField(default=0)),
+                ('time_spent_seconds', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_progress', to='lessons.module')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='module_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'module')},
+            },
+        ),
+        migrations.RunPython(build_module_progress, migrations.RunPython.noop),
+    ]
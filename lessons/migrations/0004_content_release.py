@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0003_module_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentRelease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'get_latest_by': 'applied_at',
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_quiz_attempt_summaries(apps, schema_editor):
+    UserQuizAttempt = apps.get_model('lessons', 'UserQuizAttempt')
+    QuizAttemptSummary = apps.get_model('lessons', 'QuizAttemptSummary')
+    summaries = {}
+    attempts = UserQuizAttempt.objects.order_by('attempted_at', 'id').values_list(
+        'user_id', 'quiz_id', 'selected_answer', 'is_correct', 'attempted_at'
+    )
+    for user_id, quiz_id, selected_answer, is_correct, attempted_at in attempts.iterator(chunk_size=2000):
+        summary = summaries.get((user_id, quiz_id))
+        if summary is None:
+            summary = summaries[user_id, quiz_id] = QuizAttemptSummary(
+                user_id=user_id, quiz_id=quiz_id, attempts=0, first_attempted_at=attempted_at
+            )
+        summary.attempts += 1
+        if is_correct and summary.first_correct_at is None:
+            summary.first_correct_at = attempted_at
+        summary.last_answer = selected_answer
+        summary.last_is_correct = is_correct
+        summary.last_attempted_at = attempted_at
+    QuizAttemptSummary.objects.bulk_create(summaries.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0004_content_release'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userquizattempt',
+            index=models.Index(fields=['user', 'quiz'], name='attempt_user_quiz_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userquizattempt',
+            index=models.Index(fields=['user', '-attempted_at'], name='attempt_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userquizattempt',
+            index=models.Index(fields=['-attempted_at'], name='attempt_recent_idx'),
+        ),
+        migrations.CreateModel(
+            name='QuizAttemptSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('first_attempted_at', models.DateTimeField()),
+                ('first_correct_at', models.DateTimeField(blank=True, null=True)),
+                ('last_answer', models.IntegerField()),
+                ('last_is_correct', models.BooleanField()),
+                ('last_attempted_at', models.DateTimeField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_summaries', to='lessons.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'quiz')},
+            },
+        ),
+        migrations.RunPython(build_quiz_attempt_summaries, migrations.RunPython.noop),
+    ]
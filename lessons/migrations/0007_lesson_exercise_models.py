@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0006_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='exercise_models',
+            field=models.TextField(blank=True, help_text='Django models the exercise imports from .models (graded code only)'),
+        ),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 import json
 
+from .cache import bump_catalog_version
+from .rendering import render_markdown, render_code
+
 
 class Module(models.Model):
     """Represents a learning module (like 'Django Fundamentals')"""
@@ -39,16 +44,39 @@ class Lesson(models.Model):
     exercise_starter_code = models.TextField(blank=True)
     exercise_solution = models.TextField(blank=True)
     exercise_tests = models.TextField(blank=True, help_text="JSON array of test cases")
+    exercise_models = models.TextField(
+        blank=True, help_text="Django models the exercise imports from .models (graded code only)"
+    )
+    
+    # Pre-rendered HTML, regenerated on save (see render_html)
+    content_html = models.TextField(blank=True, editable=False)
+    django_code_html = models.TextField(blank=True, editable=False)
+    dotnet_code_html = models.TextField(blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    RENDERED_FIELDS = ['content_html', 'django_code_html', 'dotnet_code_html']
+    
     class Meta:
         ordering = ['module', 'order']
         unique_together = ['module', 'slug']
     
     def __str__(self):
         return f"{self.module.title} - {self.title}"
+    
+    def render_html(self):
+        """Render content and code samples into their *_html columns"""
+        self.content_html = render_markdown(self.content)
+        self.django_code_html = render_code(self.django_code, 'python')
+        self.dotnet_code_html = render_code(self.dotnet_code, 'csharp')
+    
+    def save(self, *args, **kwargs):
+        self.render_html()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
 
 
 class UserProgress(models.Model):
@@ -73,7 +101,30 @@ class UserProgress(models.Model):
     def mark_complete(self):
         self.completed = True
         self.completed_at = timezone.now()
-        self.save()
+        # Leave the buffered counters (lessons/progress.py) alone
+        self.save(update_fields=['completed', 'completed_at', 'last_accessed'])
+
+
+class ModuleProgress(models.Model):
+    """
+    Per-user, per-module progress rollup, kept up to date by lessons/progress.py
+    so dashboards don't have to aggregate every UserProgress row
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='module_progress')
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='user_progress')
+    completed_lessons = models.IntegerField(default=0)
+    total_lessons = models.IntegerField(default=0)
+    time_spent_seconds = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'module']
+    
+    @property
+    def progress_percentage(self):
+        if self.total_lessons <= 0:
+            return 0
+        return int(self.completed_lessons / self.total_lessons * 100)
 
 
 class CodeSnippet(models.Model):
@@ -121,3 +172,93 @@ class UserQuizAttempt(models.Model):
     
     class Meta:
         ordering = ['-attempted_at']
+        indexes = [
+            models.Index(fields=['user', 'quiz'], name='attempt_user_quiz_idx'),
+            models.Index(fields=['user', '-attempted_at'], name='attempt_user_recent_idx'),
+            models.Index(fields=['-attempted_at'], name='attempt_recent_idx'),
+        ]
+
+
+class QuizAttemptSummary(models.Model):
+    """
+    One row per user and quiz they've answered, kept up to date by
+    lessons/progress.py, so "has this user answered this quiz" doesn't scan
+    their raw attempts
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_summaries')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='user_summaries')
+    attempts = models.IntegerField(default=0)
+    first_attempted_at = models.DateTimeField()
+    first_correct_at = models.DateTimeField(null=True, blank=True)
+    last_answer = models.IntegerField()
+    last_is_correct = models.BooleanField()
+    last_attempted_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['user', 'quiz']
+
+
+class CatalogVersion(models.Model):
+    """
+    Single row holding the current catalog content version (see lessons/cache.py).
+    Kept in the database so every process sees a content change as soon as it
+    commits, whatever the cache backend.
+    """
+    version = models.CharField(max_length=32)
+
+
+class ContentRelease(models.Model):
+    """A content bundle applied by populate_tutorial (see lessons/bundle.py)"""
+    content_hash = models.CharField(max_length=64)
+    applied_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        get_latest_by = 'applied_at'
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=CodeSnippet)
+@receiver(post_delete, sender=CodeSnippet)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Bump the catalog version whenever course content changes"""
+    # In the same transaction, so other processes see the new version and the
+    # new rows together
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def refresh_module_rollups(sender, instance, **kwargs):
+    """Lesson totals (and, on delete, completed counts) change for everyone in the module"""
+    from .progress import refresh_module_progress, stale_rollup_modules
+    
+    def refresh():
+        refresh_module_progress(module_ids={instance.module_id} | stale_rollup_modules())
+    
+    # Wait for cascading deletes to finish
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=UserProgress)
+@receiver(post_delete, sender=UserProgress)
+def refresh_progress_rollup(sender, instance, origin=None, **kwargs):
+    """
+    Keep the ModuleProgress rollup in step with single-row progress writes
+    (admin, the progress API); the bulk paths in progress.py refresh it themselves
+    """
+    from .progress import refresh_module_progress
+    
+    # A deleted user's rollups go with it; a deleted lesson refreshes its module
+    if kwargs.get('signal') is post_delete and not (
+        isinstance(origin, UserProgress)
+        or isinstance(origin, models.QuerySet) and origin.model is UserProgress
+    ):
+        return
+    module_id = Lesson.objects.filter(pk=instance.lesson_id).values_list('module_id', flat=True).first()
+    if module_id is not None:
+        refresh_module_progress(pairs=[(instance.user_id, module_id)])
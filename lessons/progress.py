@@ -0,0 +1,401 @@
+"""
+Write paths for UserProgress that run on every open lesson tab.
+
+Heartbeats and exercise attempts don't write to the database. They are
+collected in a per-process ProgressBuffer and flushed in one transaction with
+bulk_update every PROGRESS_FLUSH_INTERVAL_SECONDS, and again when the process
+exits. Counters are flushed as F() increments, so several processes flushing
+the same row don't overwrite each other.
+
+Reads (the progress overlay, summaries) see buffered changes once they are
+flushed. Set PROGRESS_WRITE_BEHIND = False to flush on every change instead.
+
+Each flush, import and lesson change also refreshes the affected
+ModuleProgress rollup rows (see refresh_module_progress); single-row saves
+and deletes (completions, admin, the progress API) refresh theirs through a
+receiver in models.py. Quiz attempts are
+saved with record_quiz_attempts, which keeps the per-quiz QuizAttemptSummary
+rows in step.
+"""
+import atexit
+import logging
+import operator
+import os
+import threading
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import Module, Lesson, Quiz, UserProgress, ModuleProgress, UserQuizAttempt, QuizAttemptSummary
+
+logger = logging.getLogger(__name__)
+
+
+class PendingProgress:
+    """Changes to one UserProgress row that haven't been written yet"""
+    __slots__ = ('time_spent_seconds', 'exercise_attempts', 'last_accessed',
+                 'exercise_code', 'exercise_completed')
+
+    def __init__(self):
+        self.time_spent_seconds = 0
+        self.exercise_attempts = 0
+        self.last_accessed = None
+        self.exercise_code = None
+        self.exercise_completed = False
+
+    def merge(self, other):
+        self.time_spent_seconds += other.time_spent_seconds
+        self.exercise_attempts += other.exercise_attempts
+        if self.last_accessed is None or (other.last_accessed and other.last_accessed > self.last_accessed):
+            self.last_accessed = other.last_accessed
+        # self holds the newer changes, so its code wins
+        if self.exercise_code is None:
+            self.exercise_code = other.exercise_code
+        self.exercise_completed = self.exercise_completed or other.exercise_completed
+
+
+class ProgressBuffer:
+    """Per-process write-behind buffer for the hot UserProgress columns"""
+
+    FIELDS = ['time_spent_seconds', 'exercise_attempts', 'last_accessed',
+              'exercise_code', 'exercise_completed']
+
+    def __init__(self, interval=5):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, user_id, lesson_id, time_spent_seconds=0, exercise_attempts=0,
+            exercise_code=None, exercise_completed=False):
+        with self._lock:
+            pending = self._pending.get((user_id, lesson_id))
+            if pending is None:
+                pending = self._pending[(user_id, lesson_id)] = PendingProgress()
+            pending.time_spent_seconds += time_spent_seconds
+            pending.exercise_attempts += exercise_attempts
+            pending.last_accessed = timezone.now()
+            if exercise_code is not None:
+                pending.exercise_code = exercise_code
+            pending.exercise_completed = pending.exercise_completed or exercise_completed
+
+    def pending_time(self, user_id, lesson_id):
+        with self._lock:
+            pending = self._pending.get((user_id, lesson_id))
+            return pending.time_spent_seconds if pending else 0
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows updated"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                return self._write(pending)
+            except Exception:
+                # Keep the changes for the next flush rather than dropping them
+                with self._lock:
+                    for key, change in pending.items():
+                        if key in self._pending:
+                            self._pending[key].merge(change)
+                        else:
+                            self._pending[key] = change
+                raise
+
+    def _write(self, pending):
+        user_ids = {user_id for user_id, _ in pending}
+        lesson_ids = {lesson_id for _, lesson_id in pending}
+        # Lessons or users deleted since the change was buffered are dropped
+        user_ids &= set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        lesson_modules = dict(Lesson.objects.filter(id__in=lesson_ids).values_list('id', 'module_id'))
+        lesson_ids &= set(lesson_modules)
+        keys = [key for key in pending if key[0] in user_ids and key[1] in lesson_ids]
+        if not keys:
+            return 0
+
+        with transaction.atomic():
+            UserProgress.objects.bulk_create(
+                [UserProgress(user_id=user_id, lesson_id=lesson_id) for user_id, lesson_id in keys],
+                ignore_conflicts=True
+            )
+            rows = UserProgress.objects.filter(
+                user_id__in=user_ids, lesson_id__in=lesson_ids
+            ).only('id', 'user_id', 'lesson_id')
+
+            updates = []
+            for row in rows:
+                change = pending.get((row.user_id, row.lesson_id))
+                if change is None:
+                    continue
+                row.time_spent_seconds = F('time_spent_seconds') + change.time_spent_seconds
+                row.exercise_attempts = F('exercise_attempts') + change.exercise_attempts
+                row.last_accessed = change.last_accessed
+                row.exercise_code = (
+                    F('exercise_code') if change.exercise_code is None else change.exercise_code
+                )
+                row.exercise_completed = True if change.exercise_completed else F('exercise_completed')
+                updates.append(row)
+            updated = UserProgress.objects.bulk_update(updates, self.FIELDS, batch_size=500)
+            refresh_module_progress(
+                pairs={(user_id, lesson_modules[lesson_id]) for user_id, lesson_id in keys}
+            )
+            return updated
+
+    def start(self):
+        """Flush on an interval from a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing buffered progress failed')
+            finally:
+                close_old_connections()
+
+    def close(self):
+        """Stop the background thread and write what's left"""
+        self._stopped.set()
+        self.flush()
+
+
+_buffer = None
+_buffer_pid = None
+_buffer_lock = threading.Lock()
+
+
+def write_behind_enabled():
+    return getattr(settings, 'PROGRESS_WRITE_BEHIND', True)
+
+
+def get_progress_buffer():
+    """Return this process's progress buffer, starting its flush thread on first use"""
+    global _buffer, _buffer_pid
+    with _buffer_lock:
+        # A buffer inherited across fork() belongs to the parent; start afresh
+        if _buffer is None or _buffer_pid != os.getpid():
+            _buffer = ProgressBuffer(getattr(settings, 'PROGRESS_FLUSH_INTERVAL_SECONDS', 5))
+            _buffer_pid = os.getpid()
+            if write_behind_enabled():
+                _buffer.start()
+                atexit.register(_buffer.close)
+        return _buffer
+
+
+def buffer_progress(user, lesson_id, **changes):
+    """Record changes to one user's progress on a lesson (see ProgressBuffer.add)"""
+    progress_buffer = get_progress_buffer()
+    progress_buffer.add(user.id, lesson_id, **changes)
+    if not write_behind_enabled():
+        progress_buffer.flush()
+
+
+def add_time_spent(user, deltas):
+    """
+    Add seconds to the user's time_spent_seconds for several lessons at once.
+
+    deltas maps lesson id to seconds. The time is buffered and written with
+    atomic F() increments, so concurrent heartbeats never lose time. Unknown
+    lessons are dropped when the buffer is flushed. Returns the number of
+    lessons recorded.
+    """
+    recorded = 0
+    for lesson_id, seconds in deltas.items():
+        if seconds > 0:
+            buffer_progress(user, lesson_id, time_spent_seconds=seconds)
+            recorded += 1
+    return recorded
+
+
+def upsert_imported_progress(user, entries):
+    """
+    Upsert imported progress for one user in a single transaction.
+
+    entries maps lesson id to a dict of completed, exercise_completed and
+    time_spent_seconds, which replace the stored values. Lessons are looked up
+    with one in_bulk and rows written with one upsert, so the number of
+    queries doesn't grow with the import. Returns {lesson_id: outcome}, where
+    outcome is 'created', 'updated' or 'unknown_lesson'.
+    """
+    lessons = Lesson.objects.only('id', 'module_id').in_bulk(list(entries))
+    outcomes = {}
+    with transaction.atomic():
+        existing = set(
+            UserProgress.objects.filter(user=user, lesson_id__in=lessons).values_list('lesson_id', flat=True)
+        )
+        rows = []
+        for lesson_id, values in entries.items():
+            if lesson_id not in lessons:
+                outcomes[lesson_id] = 'unknown_lesson'
+                continue
+            rows.append(UserProgress(user=user, lesson_id=lesson_id, **values))
+            outcomes[lesson_id] = 'updated' if lesson_id in existing else 'created'
+        UserProgress.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'lesson'],
+            update_fields=['completed', 'exercise_completed', 'time_spent_seconds', 'last_accessed'],
+            batch_size=500
+        )
+        refresh_module_progress(pairs={(user.id, lesson.module_id) for lesson in lessons.values()})
+    return outcomes
+
+
+def refresh_module_progress(pairs=(), module_ids=()):
+    """
+    Recompute ModuleProgress rollup rows from UserProgress.
+
+    pairs is a collection of (user_id, module_id); module_ids refreshes every
+    user with a rollup row or any progress in those modules. However many rows
+    are refreshed, this is one grouped aggregate plus one upsert.
+    """
+    pairs = set(pairs)
+    if module_ids:
+        pairs |= set(
+            ModuleProgress.objects.filter(module_id__in=module_ids).values_list('user_id', 'module_id')
+        )
+        pairs |= set(
+            UserProgress.objects.filter(lesson__module_id__in=module_ids)
+            .values_list('user_id', 'lesson__module_id').distinct()
+        )
+    if not pairs:
+        return 0
+
+    user_ids = {user_id for user_id, _ in pairs}
+    existing_modules = set(
+        Module.objects.filter(id__in={module_id for _, module_id in pairs}).values_list('id', flat=True)
+    )
+    lesson_counts = dict(
+        Lesson.objects.filter(module_id__in=existing_modules).order_by()
+        .values('module_id').annotate(count=Count('id')).values_list('module_id', 'count')
+    )
+    totals = {
+        (row['user_id'], row['lesson__module_id']): row
+        for row in UserProgress.objects.filter(
+            user_id__in=user_ids, lesson__module_id__in=existing_modules
+        ).order_by().values('user_id', 'lesson__module_id').annotate(
+            completed=Count('id', filter=Q(completed=True)),
+            time=Sum('time_spent_seconds')
+        )
+    }
+
+    rollups = []
+    for user_id, module_id in pairs:
+        if module_id not in existing_modules:
+            continue
+        row = totals.get((user_id, module_id), {})
+        rollups.append(ModuleProgress(
+            user_id=user_id,
+            module_id=module_id,
+            completed_lessons=row.get('completed', 0),
+            total_lessons=lesson_counts.get(module_id, 0),
+            time_spent_seconds=row.get('time') or 0
+        ))
+    ModuleProgress.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['user', 'module'],
+        update_fields=['completed_lessons', 'total_lessons', 'time_spent_seconds', 'updated_at']
+    )
+    return len(rollups)
+
+
+def stale_rollup_modules():
+    """Modules whose rollups disagree with the current lesson count (e.g. a lesson moved)"""
+    lesson_counts = dict(
+        Lesson.objects.order_by().values('module_id').annotate(count=Count('id'))
+        .values_list('module_id', 'count')
+    )
+    return {
+        module_id
+        for module_id, total in ModuleProgress.objects.order_by()
+        .values_list('module_id', 'total_lessons').distinct()
+        if lesson_counts.get(module_id, 0) != total
+    }
+
+
+def record_quiz_attempts(attempts):
+    """
+    Save unsaved UserQuizAttempts with one insert and refresh the
+    QuizAttemptSummary rows they touch, in one transaction. Attempts on
+    quizzes that no longer exist are dropped. Returns the saved attempts.
+    """
+    # The catalog snapshot can lag a deleted quiz by a moment
+    quiz_ids = set(
+        Quiz.objects.filter(id__in={attempt.quiz_id for attempt in attempts}).values_list('id', flat=True)
+    )
+    attempts = [attempt for attempt in attempts if attempt.quiz_id in quiz_ids]
+    if not attempts:
+        return []
+    with transaction.atomic():
+        attempts = UserQuizAttempt.objects.bulk_create(attempts)
+        refresh_quiz_summaries({(attempt.user_id, attempt.quiz_id) for attempt in attempts})
+    return attempts
+
+
+def refresh_quiz_summaries(pairs):
+    """
+    Recompute QuizAttemptSummary rows from UserQuizAttempt.
+
+    pairs is a collection of (user_id, quiz_id). Each pair's attempts are
+    found through the (user, quiz) index, so this is one grouped aggregate
+    plus one upsert however long the users' histories are. Pairs with no
+    attempts left (e.g. deleted in admin) lose their summary row.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    user_ids = {user_id for user_id, _ in pairs}
+    quiz_ids = {quiz_id for _, quiz_id in pairs}
+    latest = UserQuizAttempt.objects.filter(
+        user_id=OuterRef('user_id'), quiz_id=OuterRef('quiz_id')
+    ).order_by('-attempted_at', '-id')
+    rows = UserQuizAttempt.objects.filter(
+        user_id__in=user_ids, quiz_id__in=quiz_ids
+    ).order_by().values('user_id', 'quiz_id').annotate(
+        count=Count('id'),
+        first_attempted_at=Min('attempted_at'),
+        first_correct_at=Min('attempted_at', filter=Q(is_correct=True)),
+        last_answer=Subquery(latest.values('selected_answer')[:1]),
+        last_is_correct=Subquery(latest.values('is_correct')[:1]),
+        last_attempted_at=Subquery(latest.values('attempted_at')[:1])
+    )
+
+    summaries = []
+    for row in rows:
+        if (row['user_id'], row['quiz_id']) not in pairs:
+            continue
+        summaries.append(QuizAttemptSummary(
+            user_id=row['user_id'],
+            quiz_id=row['quiz_id'],
+            attempts=row['count'],
+            first_attempted_at=row['first_attempted_at'],
+            first_correct_at=row['first_correct_at'],
+            last_answer=row['last_answer'],
+            last_is_correct=row['last_is_correct'],
+            last_attempted_at=row['last_attempted_at']
+        ))
+    QuizAttemptSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['user', 'quiz'],
+        update_fields=['attempts', 'first_attempted_at', 'first_correct_at',
+                       'last_answer', 'last_is_correct', 'last_attempted_at']
+    )
+    emptied = pairs - {(summary.user_id, summary.quiz_id) for summary in summaries}
+    if emptied:
+        QuizAttemptSummary.objects.filter(
+            reduce(operator.or_, (Q(user_id=user_id, quiz_id=quiz_id) for user_id, quiz_id in emptied))
+        ).delete()
+    return len(summaries)
@@ -0,0 +1,80 @@
+"""
+Read-side queries for progress dashboards.
+
+progress_by_module(user) answers "how far is this user through each module"
+with two queries however large the course is: one annotated module list
+(lesson count per module) and one grouped aggregate of the user's progress.
+The aggregate reads the ModuleProgress rollup by default, or UserProgress
+joined to Lesson.module with live=True. Async views use aprogress_by_module.
+"""
+from django.db.models import Count, F, Q, Sum
+
+from .models import Module, UserProgress, ModuleProgress
+
+
+def module_rows():
+    return Module.objects.order_by('order').annotate(
+        total_lessons=Count('lessons')
+    ).values('id', 'title', 'slug', 'order', 'total_lessons')
+
+
+def user_module_totals(user, live=False):
+    """Completed lessons and time spent per module id for one user"""
+    if live:
+        return UserProgress.objects.filter(user=user).order_by().values(
+            module_id=F('lesson__module_id')
+        ).annotate(
+            completed_lessons=Count('id', filter=Q(completed=True)),
+            time_spent_seconds=Sum('time_spent_seconds')
+        )
+    return ModuleProgress.objects.filter(user=user).values(
+        'module_id', 'completed_lessons', 'time_spent_seconds'
+    )
+
+
+def combine(modules, totals):
+    by_module = {row['module_id']: row for row in totals}
+    results = []
+    for module in modules:
+        row = by_module.get(module['id'], {})
+        completed = row.get('completed_lessons', 0)
+        total = module['total_lessons']
+        results.append({
+            **module,
+            'completed_lessons': completed,
+            'time_spent_seconds': row.get('time_spent_seconds') or 0,
+            'progress_percentage': int((completed / total * 100) if total > 0 else 0),
+        })
+    return results
+
+
+def progress_by_module(user, live=False):
+    """The user's progress in every module, in module order"""
+    return combine(list(module_rows()), list(user_module_totals(user, live)))
+
+
+async def aprogress_by_module(user, live=False):
+    """Async version of progress_by_module"""
+    modules = [module async for module in module_rows()]
+    totals = [row async for row in user_module_totals(user, live)]
+    return combine(modules, totals)
+
+
+def progress_summary(modules_progress):
+    """The /api/progress/summary/ body, built from progress_by_module's result"""
+    total_lessons = sum(module['total_lessons'] for module in modules_progress)
+    completed_lessons = sum(module['completed_lessons'] for module in modules_progress)
+    return {
+        'total_lessons': total_lessons,
+        'completed_lessons': completed_lessons,
+        'progress_percentage': int((completed_lessons / total_lessons * 100) if total_lessons > 0 else 0),
+        'total_time_seconds': sum(module['time_spent_seconds'] for module in modules_progress),
+        'modules_progress': [
+            {
+                'id': module['id'],
+                'title': module['title'],
+                'progress_percentage': module['progress_percentage']
+            }
+            for module in modules_progress
+        ]
+    }
@@ -0,0 +1,73 @@
+"""
+Server-side rendering of lesson content.
+
+Lesson markdown and code samples are rendered to sanitized, syntax-highlighted
+HTML when a lesson is saved, so clients can display them without running
+marked/Prism on every page view. Highlighting uses Pygments CSS classes; the
+matching stylesheet lives in static/css/pygments.css.
+"""
+import markdown
+import nh3
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'codehilite']
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {'css_class': 'codehilite', 'guess_lang': False},
+}
+
+# Pygments output relies on class attributes for colouring
+ALLOWED_ATTRIBUTES = {
+    tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()
+}
+for tag in ('div', 'span', 'pre', 'code', 'table', 'th', 'td'):
+    ALLOWED_ATTRIBUTES.setdefault(tag, set()).add('class')
+
+
+def sanitize_html(html):
+    """Strip scripts, event handlers and other unsafe markup"""
+    return nh3.clean(html, attributes=ALLOWED_ATTRIBUTES)
+
+
+def render_markdown(text):
+    """Render lesson markdown to sanitized HTML with highlighted code blocks"""
+    if not text:
+        return ''
+    html = markdown.markdown(
+        text,
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+    )
+    return sanitize_html(html)
+
+
+def render_code(code, language):
+    """
+    Highlight a code sample. Returns the inner markup only (no <pre>), ready
+    to drop into an existing <code> element.
+    """
+    if not code:
+        return ''
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        lexer = get_lexer_by_name('text')
+    html = highlight(code, lexer, HtmlFormatter(nowrap=True))
+    return sanitize_html(html)
+
+
+STYLE_SCOPES = ['.codehilite', 'code.highlighted']
+
+
+def stylesheet(style='monokai'):
+    """CSS for the highlighted markup, as shipped in static/css/pygments.css"""
+    formatter = HtmlFormatter(style=style)
+    # get_style_defs() would also emit bare pre and line-number rules that
+    # restyle every <pre> on the site; only the highlighted blocks get them
+    return '\n'.join([
+        '.codehilite pre, code.highlighted { line-height: 125%; }',
+        *formatter.get_background_style_defs(STYLE_SCOPES),
+        *formatter.get_token_style_defs(STYLE_SCOPES),
+    ])
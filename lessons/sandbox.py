@@ -0,0 +1,265 @@
+"""
+Pool of warm, resource-limited exercise runner processes.
+
+Starting a fresh interpreter for every submission dominates grading latency
+and lets load spawn an unbounded number of processes. Instead each web worker
+keeps a small pool of long-lived runners (see sandbox_worker.py) and sends
+them code plus tests over a pipe. Runners fork a child per run with CPU and
+memory limits applied, and are recycled after a configurable number of runs.
+Every test runs in isolation and is reported individually.
+
+Submissions that import Django or DRF, use relative imports into their own
+app, or come with a models stub (the models an exercise imports from
+.models), are flagged as Django jobs; runners start with Django preloaded (see
+sandbox_worker.preload_django) so those fork in milliseconds too.
+
+Settings:
+    EXERCISE_POOL_SIZE          runner processes per web worker
+    EXERCISE_POOL_MAX_RUNS      recycle a runner after this many runs
+    EXERCISE_TIMEOUT_SECONDS    wall-clock limit per run
+    EXERCISE_TEST_TIMEOUT_SECONDS  wall-clock limit per test within a run
+    EXERCISE_CPU_LIMIT_SECONDS  CPU limit per run
+    EXERCISE_MEMORY_LIMIT_MB    address-space limit per run
+    EXERCISE_PRELOAD_DJANGO     load Django into runners when they start
+"""
+import atexit
+import json
+import os
+import queue
+import re
+import select
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+# Extra time allowed for the runner to report back after the run's own timeout
+RESPONSE_GRACE_SECONDS = 2
+
+DJANGO_IMPORT = re.compile(
+    r'^\s*(?:from\s+(?:django|rest_framework)\b|import\s+(?:django|rest_framework)\b|from\s+\.)',
+    re.MULTILINE
+)
+
+SandboxResult = namedtuple(
+    'SandboxResult', ['returncode', 'stdout', 'stderr', 'timed_out', 'tests'],
+    defaults=((),)
+)
+
+
+class SandboxError(Exception):
+    """The runner process failed to return a result"""
+
+
+def uses_django(code, tests):
+    """Whether the submission or its tests need the Django runtime"""
+    sources = [code] + [test.get('code', '') for test in tests]
+    return any(DJANGO_IMPORT.search(source) for source in sources)
+
+
+class RunnerProcess:
+    """One warm runner process and its pipe"""
+
+    def __init__(self, preload_django=False):
+        args = [sys.executable, '-I', WORKER_PATH]
+        if preload_django:
+            args.append('--django')
+        self.process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+        )
+        self.runs = 0
+        self._buffer = b''
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def run(self, job, timeout, on_test=None):
+        data = json.dumps(job).encode()
+        try:
+            self.process.stdin.write(b'%d\n' % len(data) + data)
+        except (BrokenPipeError, OSError) as e:
+            raise SandboxError(f'Runner unavailable: {e}')
+        self.runs += 1
+        deadline = time.monotonic() + timeout
+        while True:
+            message = json.loads(self._read_frame(deadline))
+            if 'returncode' in message:
+                return message
+            # A streamed per-test report
+            if on_test is not None:
+                on_test(message['test'])
+
+    def _read_frame(self, deadline):
+        fd = self.process.stdout.fileno()
+        while True:
+            if b'\n' in self._buffer:
+                header, rest = self._buffer.split(b'\n', 1)
+                length = int(header)
+                if len(rest) >= length:
+                    self._buffer = rest[length:]
+                    return rest[:length]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SandboxError('Runner did not respond in time')
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise SandboxError('Runner exited unexpectedly')
+            self._buffer += chunk
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+
+
+class SandboxPool:
+    """Bounded pool of RunnerProcess instances shared by the threads of one web worker"""
+
+    def __init__(self, size=2, max_runs=200, timeout=5, test_timeout=2, cpu_seconds=5, memory_mb=256,
+                 preload_django=True):
+        self.size = size
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self.test_timeout = test_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.preload_django = preload_django
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._closed = False
+
+    def warm(self):
+        """Start every runner up front so the first submissions don't pay for it"""
+        while self._idle.qsize() < self.size:
+            self._idle.put(RunnerProcess(self.preload_django))
+
+    def _checkout(self):
+        while True:
+            try:
+                runner = self._idle.get_nowait()
+            except queue.Empty:
+                return RunnerProcess(self.preload_django)
+            if runner.is_alive():
+                return runner
+            runner.close()
+
+    def _checkin(self, runner):
+        if self._closed or runner.runs >= self.max_runs or not runner.is_alive():
+            runner.close()
+        else:
+            self._idle.put(runner)
+
+    def job(self, code, tests, timeout=None, stream=False, models=''):
+        return {
+            'code': code,
+            'tests': tests,
+            'models': models,
+            'timeout': timeout or self.timeout,
+            'test_timeout': self.test_timeout,
+            'cpu_seconds': self.cpu_seconds,
+            'memory_mb': self.memory_mb,
+            'django': bool(models) or uses_django(code, tests),
+            'stream': stream,
+        }
+
+    def run(self, code, tests, timeout=None, on_test=None, models=''):
+        """
+        Run code against its tests in a runner; blocks while all runners are busy.
+        on_test, if given, is called with each test's report as it finishes.
+        models is Django model code the submission can import from .models.
+        """
+        job = self.job(code, tests, timeout, stream=on_test is not None, models=models)
+        with self._slots:
+            runner = self._checkout()
+            try:
+                result = runner.run(job, job['timeout'] + RESPONSE_GRACE_SECONDS, on_test)
+            except Exception:
+                runner.close()
+                raise
+            self._checkin(runner)
+        return SandboxResult(**result)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def run_in_subprocess(job):
+    """Fallback for platforms without fork: one fresh interpreter per run"""
+    data = json.dumps(job).encode()
+    try:
+        result = subprocess.run(
+            [sys.executable, '-I', WORKER_PATH, '--once'],
+            input=b'%d\n' % len(data) + data,
+            capture_output=True,
+            timeout=job['timeout']
+        )
+    except subprocess.TimeoutExpired:
+        return SandboxResult(None, '', '', True)
+    header, _, payload = result.stdout.partition(b'\n')
+    if not header:
+        raise SandboxError(result.stderr.decode('utf-8', errors='replace'))
+    return SandboxResult(**json.loads(payload[:int(header)]))
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def configured_pool(**overrides):
+    """A pool built from settings; no runners are started until used"""
+    options = {
+        'size': getattr(settings, 'EXERCISE_POOL_SIZE', 2),
+        'max_runs': getattr(settings, 'EXERCISE_POOL_MAX_RUNS', 200),
+        'timeout': getattr(settings, 'EXERCISE_TIMEOUT_SECONDS', 5),
+        'test_timeout': getattr(settings, 'EXERCISE_TEST_TIMEOUT_SECONDS', 2),
+        'cpu_seconds': getattr(settings, 'EXERCISE_CPU_LIMIT_SECONDS', 5),
+        'memory_mb': getattr(settings, 'EXERCISE_MEMORY_LIMIT_MB', 256),
+        'preload_django': getattr(settings, 'EXERCISE_PRELOAD_DJANGO', True),
+    }
+    options.update(overrides)
+    return SandboxPool(**options)
+
+
+def get_pool():
+    """Return this process's runner pool, creating it on first use"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited across fork() shares pipes with the parent; start afresh
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = configured_pool()
+            _pool_pid = os.getpid()
+            _pool.warm()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def run_tests(code, tests, timeout=None, pool=None, on_test=None, models=''):
+    """
+    Run code against its tests with the best runner available on this platform.
+    Uses this process's shared pool unless another pool is given. on_test is
+    called with each test's report as it finishes, where the runner supports it.
+    """
+    if not hasattr(os, 'fork'):
+        return run_in_subprocess(configured_pool().job(code, tests, timeout, models=models))
+    return (pool or get_pool()).run(code, tests, timeout, on_test, models)
@@ -0,0 +1,477 @@
+"""
+Exercise runner worker process.
+
+Started by lessons.sandbox.SandboxPool as ``python -I sandbox_worker.py``.
+The worker stays warm and reads jobs from stdin, each framed as a decimal
+byte length, a newline, and that many bytes of JSON:
+
+    {"code": "...", "tests": [{"code": "...", "expected": "..."}], "models": "",
+     "timeout": 5, "test_timeout": 2, "cpu_seconds": 5, "memory_mb": 256}
+
+Frames are read without read-ahead so a forked child never inherits a buffer
+holding someone else's job.
+
+Each job runs in a child forked from this process, so user code never touches
+the worker's own state, and per-run CPU/memory limits apply to the child only.
+The child executes the submitted code once, then every test in its own copy of
+the resulting namespace with its own stdout capture and time budget. Each
+test's outcome is appended as a JSON line to a side-channel results file as
+soon as it finishes, so a crash or timeout still reports the tests that ran.
+
+The result is written back on stdout, framed the same way:
+
+    {"returncode": 0, "stdout": "...", "stderr": "...", "timed_out": false,
+     "tests": [{"index": 0, "passed": true, "expected": "3", "actual": "3",
+                "duration_ms": 0.1, "exception": null, "timed_out": false}]}
+
+Jobs with ``"stream": true`` also get a ``{"test": {...}}`` frame for each
+test as soon as it finishes, before the result frame.
+
+Jobs with ``"django": true`` run against a preloaded, throwaway Django
+configuration (see preload_django). Their ``models`` code, if any, runs as
+the scratch app's models module before the submission. With ``--django`` the worker loads it at
+startup so the first such job doesn't pay for it; otherwise it is loaded the
+first time a job asks for it. Either way it is loaded in the long-lived
+worker, so every forked run inherits it copy-on-write.
+
+With ``--once`` a single job is read and run without forking, for platforms
+that lack fork().
+
+This module only imports the standard library at module level; it is not the
+site's Django process, and Django is only imported by preload_django.
+"""
+import contextlib
+import importlib
+import importlib.machinery
+import io
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+POLL_INTERVAL = 0.002
+MAX_OUTPUT_BYTES = 64 * 1024
+MAX_TRACEBACK_CHARS = 4000
+
+# Package the submitted code of Django jobs lives in, as <package>.submission
+EXERCISE_APP = 'exercise'
+
+# Imported up front in --django mode so forked runs find them warm
+DJANGO_PRELOAD_MODULES = [
+    'django.contrib.auth.models',
+    'django.db.models',
+    'django.http',
+    'django.shortcuts',
+    'django.urls',
+    'django.views',
+    'django.views.generic',
+    'rest_framework.decorators',
+    'rest_framework.response',
+    'rest_framework.routers',
+    'rest_framework.serializers',
+    'rest_framework.views',
+    'rest_framework.viewsets',
+]
+
+django_loaded = False
+
+
+class TestTimeout(BaseException):
+    """Raised inside a test that exceeds its time budget"""
+
+
+def apply_limits(cpu_seconds, memory_mb):
+    if resource is None:
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def format_exception(e):
+    # Skip the harness frame so the traceback starts in the user's code
+    text = ''.join(traceback.format_exception(type(e), e, e.__traceback__.tb_next))
+    return text[-MAX_TRACEBACK_CHARS:]
+
+
+def set_test_timer(seconds):
+    if hasattr(signal, 'setitimer'):
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+
+def on_test_timeout(signum, frame):
+    raise TestTimeout('Test exceeded its time limit')
+
+
+def run_test(index, test, namespace, setup_error, test_timeout):
+    expected = str(test.get('expected', ''))
+    report = {
+        'index': index,
+        'passed': False,
+        'expected': expected,
+        'actual': '',
+        'duration_ms': 0.0,
+        'exception': setup_error,
+        'timed_out': False,
+    }
+    if setup_error:
+        return report
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        try:
+            set_test_timer(test_timeout)
+            with contextlib.redirect_stdout(output):
+                exec(compile(test.get('code', ''), f'<test {index + 1}>', 'exec'), dict(namespace))
+        finally:
+            set_test_timer(0)
+    except TestTimeout as e:
+        report['exception'] = f'{e} ({test_timeout}s)'
+        report['timed_out'] = True
+    except BaseException as e:
+        report['exception'] = format_exception(e)
+    report['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    report['actual'] = output.getvalue().strip()
+    report['passed'] = report['exception'] is None and report['actual'] == expected
+    return report
+
+
+def new_module(name, package=False):
+    module = types.ModuleType(name)
+    module.__spec__ = importlib.machinery.ModuleSpec(name, None, is_package=package)
+    if package:
+        module.__path__ = []
+    sys.modules[name] = module
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def placeholder_module(name, factory):
+    """A module of the scratch app whose missing attributes are made up on demand"""
+    module = new_module(f'{EXERCISE_APP}.{name}')
+
+    def __getattr__(attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        value = factory(attr)
+        setattr(module, attr, value)
+        return value
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+def placeholder_model(name):
+    """A model with only a primary key, for names the exercise's models stub doesn't declare"""
+    from django.db import connection, models
+    model = type(name, (models.Model,), {'__module__': f'{EXERCISE_APP}.models'})
+    with connection.schema_editor() as editor:
+        editor.create_model(model)
+    return model
+
+
+def placeholder_view(name):
+    """A view returning an empty response, for exercises that import one from .views"""
+    from django.http import HttpResponse
+
+    def view(request, *args, **kwargs):
+        return HttpResponse()
+
+    view.__name__ = name
+    return view
+
+
+def preload_django():
+    """
+    Import and configure Django and DRF against throwaway settings.
+
+    Submitted code runs as a module of a scratch ``exercise`` app, so it can
+    declare models and use relative imports such as ``from .models import
+    Product``. Names it expects from the rest of its app resolve to
+    placeholders. The database is in-memory SQLite, opened afresh in each run.
+    """
+    global django_loaded
+    if django_loaded:
+        return
+
+    import django
+    from django.apps import AppConfig
+    from django.conf import settings
+
+    new_module(EXERCISE_APP, package=True)
+    apps_module = new_module(f'{EXERCISE_APP}.apps')
+
+    class ExerciseConfig(AppConfig):
+        name = EXERCISE_APP
+        path = tempfile.gettempdir()
+        default_auto_field = 'django.db.models.AutoField'
+
+    apps_module.ExerciseConfig = ExerciseConfig
+
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='exercise-sandbox',
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'rest_framework',
+            f'{EXERCISE_APP}.apps.ExerciseConfig',
+        ],
+        DATABASES={
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        },
+        USE_TZ=True,
+    )
+    django.setup()
+
+    placeholder_module('models', placeholder_model)
+    placeholder_module('views', placeholder_view)
+    for name in DJANGO_PRELOAD_MODULES:
+        importlib.import_module(name)
+    django_loaded = True
+
+
+def create_submission_tables(module_name):
+    """Create tables for the models the submitted code declared"""
+    from django.apps import apps
+    from django.db import connection
+    models = [
+        model for model in apps.get_app_config(EXERCISE_APP).get_models()
+        if model.__module__ == module_name
+    ]
+    if models:
+        with connection.schema_editor() as editor:
+            for model in models:
+                editor.create_model(model)
+
+
+def run_tests(job, results):
+    """Run the submitted code, then each test in isolation (runs in the child)"""
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, on_test_timeout)
+
+    if job.get('django'):
+        module_name = f'{EXERCISE_APP}.submission'
+        namespace = {'__name__': module_name, '__package__': EXERCISE_APP, '__builtins__': __builtins__}
+    else:
+        module_name = '__main__'
+        namespace = {'__name__': module_name, '__builtins__': __builtins__}
+    setup_error = None
+    try:
+        if job.get('models'):
+            models_module = f'{EXERCISE_APP}.models'
+            exec(compile(job['models'], '<exercise models>', 'exec'), sys.modules[models_module].__dict__)
+            create_submission_tables(models_module)
+        exec(compile(job['code'], '<exercise>', 'exec'), namespace)
+        if job.get('django'):
+            create_submission_tables(module_name)
+    except BaseException as e:
+        setup_error = format_exception(e)
+        sys.stderr.write(setup_error)
+
+    for index, test in enumerate(job.get('tests', [])):
+        try:
+            report = run_test(index, test, namespace, setup_error, job.get('test_timeout'))
+        except TestTimeout:
+            # The timer fired after the test finished but before it was disarmed
+            continue
+        results.write(json.dumps(report) + '\n')
+        results.flush()
+    return 0
+
+
+def run_inline(job, out, err, results):
+    """Point stdio at the per-run files, apply limits and run the job"""
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out.fileno(), 1)
+    os.dup2(err.fileno(), 2)
+    apply_limits(job.get('cpu_seconds'), job.get('memory_mb'))
+    try:
+        return run_tests(job, results)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def read_output(f):
+    f.seek(0)
+    return f.read(MAX_OUTPUT_BYTES).decode('utf-8', errors='replace')
+
+
+def read_reports(f):
+    f.seek(0)
+    reports = []
+    for line in f.read().decode('utf-8', errors='replace').splitlines():
+        try:
+            reports.append(json.loads(line))
+        except ValueError:
+            break
+    return reports
+
+
+def read_new_reports(fd, offset):
+    """
+    Reports appended since offset, and the offset after the last complete one.
+    Uses pread because the child shares the file's position.
+    """
+    data = b''
+    while True:
+        chunk = os.pread(fd, 65536, offset + len(data))
+        if not chunk:
+            break
+        data += chunk
+    complete, _, _ = data.rpartition(b'\n')
+    if not complete:
+        return [], offset
+    lines = complete.decode('utf-8', errors='replace').split('\n')
+    return [json.loads(line) for line in lines], offset + len(complete) + 1
+
+
+def read_frame(fd):
+    """Read one length-prefixed frame from fd, or None at EOF"""
+    header = b''
+    while not header.endswith(b'\n'):
+        chunk = os.read(fd, 1)
+        if not chunk:
+            return None
+        header += chunk
+    remaining = int(header)
+    payload = []
+    while remaining:
+        chunk = os.read(fd, remaining)
+        if not chunk:
+            return None
+        payload.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(payload)
+
+
+def write_frame(f, data):
+    f.write(b'%d\n' % len(data) + data)
+    f.flush()
+
+
+def stream_reports(channel, results_file, offset):
+    reports, offset = read_new_reports(results_file.fileno(), offset)
+    for report in reports:
+        write_frame(channel, json.dumps({'test': report}).encode())
+    return offset
+
+
+def run_job(job, channel):
+    if job.get('django'):
+        preload_django()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err, \
+            tempfile.TemporaryFile(mode='w+b') as results_file:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                # User code must not read jobs or forge results on the channel
+                os.close(channel.fileno())
+                results = io.TextIOWrapper(results_file, write_through=True)
+                code = run_inline(job, out, err, results)
+            finally:
+                os._exit(code)
+
+        deadline = time.monotonic() + job.get('timeout', 5)
+        timed_out = False
+        offset = 0
+        while True:
+            waited_pid, status = os.waitpid(pid, os.WNOHANG)
+            if job.get('stream'):
+                offset = stream_reports(channel, results_file, offset)
+            if waited_pid:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                timed_out = True
+                status = 0
+                break
+            time.sleep(POLL_INTERVAL)
+
+        if timed_out:
+            returncode = -signal.SIGKILL
+        elif os.WIFSIGNALED(status):
+            returncode = -os.WTERMSIG(status)
+            # SIGXCPU means the CPU limit was hit
+            timed_out = os.WTERMSIG(status) == signal.SIGXCPU
+        else:
+            returncode = os.WEXITSTATUS(status)
+
+        return {
+            'returncode': returncode,
+            'stdout': read_output(out),
+            'stderr': read_output(err),
+            'timed_out': timed_out,
+            'tests': read_reports(results_file),
+        }
+
+
+def run_once(channel):
+    """Run a single job in this process (no fork available)"""
+    frame = read_frame(0)
+    if frame is None:
+        return
+    job = json.loads(frame)
+    if job.get('django'):
+        preload_django()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err, \
+            tempfile.TemporaryFile(mode='w+b') as results_file:
+        results = io.TextIOWrapper(results_file, write_through=True)
+        returncode = run_inline(job, out, err, results)
+        result = {
+            'returncode': returncode,
+            'stdout': read_output(out),
+            'stderr': read_output(err),
+            'timed_out': False,
+            'tests': read_reports(results_file),
+        }
+    write_frame(channel, json.dumps(result).encode())
+
+
+def main():
+    # Keep the protocol channel private; user output goes to per-run files
+    channel = os.fdopen(os.dup(1), 'wb')
+    if '--once' in sys.argv[1:]:
+        run_once(channel)
+        return
+    if '--django' in sys.argv[1:]:
+        try:
+            preload_django()
+        except Exception as e:
+            # Plain jobs can still run; Django jobs will report the error
+            sys.stderr.write(f'Could not preload Django: {e}\n')
+    while True:
+        frame = read_frame(0)
+        if frame is None:
+            break
+        try:
+            result = run_job(json.loads(frame), channel)
+        except Exception as e:
+            result = {
+                'returncode': 1, 'stdout': '', 'stderr': f'Runner error: {e}',
+                'timed_out': False, 'tests': [],
+            }
+        write_frame(channel, json.dumps(result).encode())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
+from .catalog import get_catalog
 from .models import Module, Lesson, UserProgress, CodeSnippet, Quiz, UserQuizAttempt
+from .progress import record_quiz_attempts
 
 
 class CodeSnippetSerializer(serializers.ModelSerializer):
@@ -18,22 +21,51 @@ class QuizSerializer(serializers.ModelSerializer):
         }
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class OptionalFieldsMixin:
+    """
+    Drops groups of fields that are switched off in the serializer context.
+    
+    optional_fields maps a context flag to (default, field names), e.g. the
+    per-user fields are left out when the context sets include_progress=False.
+    """
+    optional_fields = {}
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        for flag, (default, names) in self.optional_fields.items():
+            if not self.context.get(flag, default):
+                for name in names:
+                    fields.pop(name, None)
+        return fields
+
+
+class LessonSerializer(OptionalFieldsMixin, serializers.ModelSerializer):
     snippets = CodeSnippetSerializer(many=True, read_only=True)
     quizzes = QuizSerializer(many=True, read_only=True)
     is_completed = serializers.SerializerMethodField()
     progress = serializers.SerializerMethodField()
     
+    optional_fields = {
+        'include_progress': (True, ('is_completed', 'progress')),
+        'include_html': (False, ('content_html', 'django_code_html', 'dotnet_code_html')),
+    }
+    
     class Meta:
         model = Lesson
         fields = [
             'id', 'title', 'slug', 'content', 'order',
             'django_code', 'dotnet_code', 'has_exercise',
             'exercise_starter_code', 'exercise_solution', 'exercise_tests',
+            'content_html', 'django_code_html', 'dotnet_code_html',
             'snippets', 'quizzes', 'is_completed', 'progress'
         ]
         
     def get_is_completed(self, obj):
+        progress_map = self.context.get('progress_map')
+        if progress_map is not None:
+            progress = progress_map.get(obj.id)
+            return bool(progress and progress.completed)
+        
         request = self.context.get('request')
         if request and request.user and request.user.is_authenticated:
             return UserProgress.objects.filter(
@@ -44,28 +76,37 @@ class LessonSerializer(serializers.ModelSerializer):
         return False
     
     def get_progress(self, obj):
-        request = self.context.get('request')
-        if request and request.user and request.user.is_authenticated:
-            progress = UserProgress.objects.filter(
-                user=request.user,
-                lesson=obj
-            ).first()
-            if progress:
-                return {
-                    'completed': progress.completed,
-                    'exercise_completed': progress.exercise_completed,
-                    'time_spent_seconds': progress.time_spent_seconds,
-                    'last_accessed': progress.last_accessed
-                }
+        progress_map = self.context.get('progress_map')
+        if progress_map is not None:
+            progress = progress_map.get(obj.id)
+        else:
+            progress = None
+            request = self.context.get('request')
+            if request and request.user and request.user.is_authenticated:
+                progress = UserProgress.objects.filter(
+                    user=request.user,
+                    lesson=obj
+                ).first()
+        if progress:
+            return {
+                'completed': progress.completed,
+                'exercise_completed': progress.exercise_completed,
+                'time_spent_seconds': progress.time_spent_seconds,
+                'last_accessed': progress.last_accessed
+            }
         return None
 
 
-class ModuleSerializer(serializers.ModelSerializer):
+class ModuleSerializer(OptionalFieldsMixin, serializers.ModelSerializer):
     lessons = LessonSerializer(many=True, read_only=True)
     total_lessons = serializers.SerializerMethodField()
     completed_lessons = serializers.SerializerMethodField()
     progress_percentage = serializers.SerializerMethodField()
     
+    optional_fields = {
+        'include_progress': (True, ('completed_lessons', 'progress_percentage')),
+    }
+    
     class Meta:
         model = Module
         fields = [
@@ -76,9 +117,22 @@ class ModuleSerializer(serializers.ModelSerializer):
         ]
     
     def get_total_lessons(self, obj):
+        # Catalog querysets annotate the count (see ModuleViewSet.get_queryset)
+        lesson_count = getattr(obj, 'lesson_count', None)
+        if lesson_count is not None:
+            return lesson_count
         return obj.lessons.count()
     
     def get_completed_lessons(self, obj):
+        progress_map = self.context.get('progress_map')
+        if progress_map is not None:
+            # Snapshot records hold their lessons in a tuple rather than a manager
+            lessons = obj.lessons.all() if hasattr(obj.lessons, 'all') else obj.lessons
+            return sum(
+                1 for lesson in lessons
+                if lesson.id in progress_map and progress_map[lesson.id].completed
+            )
+        
         request = self.context.get('request')
         if request and request.user and request.user.is_authenticated:
             return UserProgress.objects.filter(
@@ -96,6 +150,30 @@ class ModuleSerializer(serializers.ModelSerializer):
         return int((completed / total) * 100)
 
 
+class LessonOutlineSerializer(serializers.ModelSerializer):
+    """Sidebar/navigation view of a lesson, without any of its content"""
+    quiz_count = serializers.IntegerField(read_only=True)
+    snippet_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Lesson
+        fields = ['id', 'title', 'slug', 'order', 'has_exercise', 'quiz_count', 'snippet_count']
+
+
+class ModuleOutlineSerializer(serializers.ModelSerializer):
+    """Module listing with lesson outlines only, for first paint"""
+    lessons = LessonOutlineSerializer(many=True, read_only=True)
+    total_lessons = serializers.IntegerField(source='lesson_count', read_only=True)
+    
+    class Meta:
+        model = Module
+        fields = [
+            'id', 'title', 'slug', 'description', 'order',
+            'estimated_minutes', 'dotnet_comparison',
+            'lessons', 'total_lessons'
+        ]
+
+
 class UserProgressSerializer(serializers.ModelSerializer):
     lesson_title = serializers.CharField(source='lesson.title', read_only=True)
     module_title = serializers.CharField(source='lesson.module.title', read_only=True)
@@ -110,6 +188,75 @@ class UserProgressSerializer(serializers.ModelSerializer):
         ]
 
 
+def cap_time_spent(seconds):
+    """Cap one reported time delta so a single request can't add unbounded time"""
+    return min(seconds, getattr(settings, 'PROGRESS_HEARTBEAT_MAX_SECONDS', 60 * 60))
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    deltas = serializers.DictField(child=serializers.IntegerField(min_value=0))
+    
+    def validate_deltas(self, value):
+        if len(value) > 100:
+            raise serializers.ValidationError("At most 100 lessons per heartbeat.")
+        try:
+            return {
+                int(lesson_id): cap_time_spent(seconds)
+                for lesson_id, seconds in value.items()
+            }
+        except ValueError:
+            raise serializers.ValidationError("Keys must be lesson ids.")
+
+
+class TrackTimeSerializer(serializers.Serializer):
+    """Body of the single-lesson track_time endpoint; validated like a heartbeat delta"""
+    time_spent_seconds = serializers.IntegerField(min_value=0, default=0)
+    
+    def validate_time_spent_seconds(self, value):
+        return cap_time_spent(value)
+
+
+class ImportedProgressSerializer(serializers.Serializer):
+    """One lesson's entry in a progress import (extra exported fields are ignored)"""
+    completed = serializers.BooleanField(default=False)
+    exercise_completed = serializers.BooleanField(default=False)
+    time_spent_seconds = serializers.IntegerField(min_value=0, default=0)
+
+
+class QuizAnswerSerializer(serializers.Serializer):
+    quiz = serializers.IntegerField()
+    selected_answer = serializers.IntegerField(min_value=0)
+
+
+class QuizBatchSerializer(serializers.Serializer):
+    lesson_id = serializers.IntegerField()
+    answers = QuizAnswerSerializer(many=True, allow_empty=False)
+    
+    def validate_lesson_id(self, value):
+        if value not in get_catalog().lessons_by_id:
+            raise serializers.ValidationError("Lesson not found.")
+        return value
+    
+    def validate(self, data):
+        # Grade against the quiz records themselves, so the answer key can't
+        # change between validation and grading
+        lesson = get_catalog().lessons_by_id.get(data['lesson_id'])
+        quizzes = {quiz.id: quiz for quiz in lesson.quizzes} if lesson else {}
+        quiz_ids = [answer['quiz'] for answer in data['answers']]
+        if len(quiz_ids) != len(set(quiz_ids)):
+            raise serializers.ValidationError({'answers': "Answer each quiz at most once."})
+        unknown = sorted(set(quiz_ids) - set(quizzes))
+        if unknown:
+            raise serializers.ValidationError({
+                'answers': f"Quizzes not in this lesson: {', '.join(map(str, unknown))}"
+            })
+        data['answers'] = [
+            (quizzes[answer['quiz']], answer['selected_answer'])
+            for answer in data['answers']
+        ]
+        return data
+
+
 class QuizAttemptSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserQuizAttempt
@@ -121,12 +268,13 @@ class QuizAttemptSerializer(serializers.ModelSerializer):
         selected_answer = validated_data['selected_answer']
         is_correct = selected_answer == quiz.correct_answer
         
-        return UserQuizAttempt.objects.create(
+        attempt, = record_quiz_attempts([UserQuizAttempt(
             user=self.context['request'].user,
             quiz=quiz,
             selected_answer=selected_answer,
             is_correct=is_correct
-        )
+        )])
+        return attempt
 
 
 class ExerciseSubmissionSerializer(serializers.Serializer):
@@ -134,10 +282,37 @@ class ExerciseSubmissionSerializer(serializers.Serializer):
     code = serializers.CharField()
     
     def validate_lesson_id(self, value):
-        try:
-            lesson = Lesson.objects.get(id=value)
-            if not lesson.has_exercise:
-                raise serializers.ValidationError("This lesson does not have an exercise.")
-            return value
-        except Lesson.DoesNotExist:
+        lesson = get_catalog().lessons_by_id.get(value)
+        if lesson is None:
             raise serializers.ValidationError("Lesson not found.")
+        if not lesson.has_exercise:
+            raise serializers.ValidationError("This lesson does not have an exercise.")
+        return value
+
+
+class BatchSubmissionItemSerializer(serializers.Serializer):
+    lesson_id = serializers.IntegerField()
+    code = serializers.CharField()
+
+
+class ExerciseBatchSerializer(serializers.Serializer):
+    submissions = BatchSubmissionItemSerializer(many=True, allow_empty=False)
+    
+    def validate_submissions(self, value):
+        max_size = getattr(settings, 'EXERCISE_BATCH_MAX_SIZE', 500)
+        if len(value) > max_size:
+            raise serializers.ValidationError(f"At most {max_size} submissions per batch.")
+        
+        lessons = get_catalog().lessons_by_id
+        errors = {}
+        for i, item in enumerate(value):
+            lesson = lessons.get(item['lesson_id'])
+            if lesson is None:
+                errors[i] = "Lesson not found."
+            elif not lesson.has_exercise:
+                errors[i] = "This lesson does not have an exercise."
+            else:
+                item['lesson'] = lesson
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
@@ -0,0 +1,21 @@
+from celery import shared_task
+from django.contrib.auth.models import User
+
+from .exercises import run_exercise_tests, record_exercise_attempt
+from .models import Lesson
+from .progress import get_progress_buffer
+
+
+@shared_task
+def grade_exercise(lesson_id, code, user_id=None):
+    """Grade a submission and record the attempt against the user's progress"""
+    lesson = Lesson.objects.get(id=lesson_id)
+    test_results = run_exercise_tests(code, lesson.exercise_tests, models=lesson.exercise_models)
+    
+    if user_id is not None:
+        user = User.objects.get(id=user_id)
+        record_exercise_attempt(user, lesson, code, test_results)
+        # Worker processes may be recycled without running exit handlers
+        get_progress_buffer().flush()
+    
+    return test_results
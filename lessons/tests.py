@@ -1,3 +1,1248 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from operator import itemgetter
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .bundle import source_changed_since, write_bundle
+from .cache import bump_catalog_version
+from .catalog import get_catalog
+from .content.module2_content import get_module2_exercises
+from .content_sync import sync_course
+from .exercises import result_cache, run_exercise_tests
+from .exports import LESSON_CSV_HEADER, PROGRESS_CSV_COLUMNS, QUIZ_ATTEMPT_CSV_COLUMNS
+from .models import (
+    Module, Lesson, Quiz, CodeSnippet, UserProgress, ModuleProgress, UserQuizAttempt, QuizAttemptSummary,
+    CatalogVersion, ContentRelease
+)
+from .progress import ProgressBuffer
+from .queries import progress_by_module
+from .rendering import stylesheet
+from .sandbox import SandboxError, configured_pool
+
+
+def create_lesson(module_slug='basics', slug='intro', quizzes=()):
+    """A lesson (and its module, if new) with quizzes given as (options, correct_answer)"""
+    module, _ = Module.objects.get_or_create(
+        slug=module_slug, defaults={'title': module_slug.title(), 'description': '', 'dotnet_comparison': ''}
+    )
+    lesson = Lesson.objects.create(module=module, title=slug.title(), slug=slug, content='')
+    for order, (options, correct_answer) in enumerate(quizzes):
+        Quiz.objects.create(
+            lesson=lesson, question=f'Question {order + 1}', options=options,
+            correct_answer=correct_answer, explanation='Because', order=order
+        )
+    return lesson
+
+
+class ExerciseGradingTests(SimpleTestCase):
+    """Grading through a real runner pool (lessons/sandbox.py, sandbox_worker.py)"""
+
+    def setUp(self):
+        self.pool = configured_pool(size=1, max_runs=200, timeout=5, test_timeout=0.5, preload_django=False)
+        self.addCleanup(self.pool.close)
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
+    def grade(self, code, tests):
+        return run_exercise_tests(code, json.dumps(tests), pool=self.pool)
+
+    def test_reports_pass_fail_and_exception_per_test(self):
+        results = self.grade('def add(a, b):\n    return a + b\n', [
+            {'code': 'print(add(1, 2))', 'expected': '3'},
+            {'code': 'print(add(1, 1))', 'expected': '3'},
+            {'code': 'print(add(1))', 'expected': '1'},
+        ])
+        passed, failed, raised = results['results']
+        self.assertFalse(results['all_passed'])
+        self.assertTrue(passed['passed'])
+        self.assertEqual((failed['passed'], failed['actual']), (False, '2'))
+        self.assertNotIn('error', failed)
+        self.assertFalse(raised['passed'])
+        self.assertIn('TypeError', raised['error'])
+
+    def test_timed_out_test_does_not_stop_the_next(self):
+        results = self.grade('', [
+            {'code': 'while True:\n    pass', 'expected': ''},
+            {'code': 'print("after")', 'expected': 'after'},
+        ])
+        looped, after = results['results']
+        self.assertFalse(looped['passed'])
+        self.assertIn('time limit', looped['error'])
+        self.assertTrue(after['passed'])
+
+    def test_timed_out_results_are_not_cached(self):
+        code, tests = 'import time', [{'code': 'time.sleep(1)', 'expected': ''}]
+        self.grade(code, tests)
+        self.assertIsNone(result_cache.get(result_cache.key(code, json.dumps(tests))))
+
+    def test_passing_results_are_cached(self):
+        code, tests = 'x = 1', [{'code': 'print(x)', 'expected': '1'}]
+        results = self.grade(code, tests)
+        self.assertEqual(result_cache.get(result_cache.key(code, json.dumps(tests))), results)
+
+    def test_output_from_user_code_does_not_shift_results(self):
+        results = self.grade('print("loading")\nvalue = 42\n', [
+            {'code': 'print("noise")\nprint(value)', 'expected': 'noise\n42'},
+            {'code': 'print(value)', 'expected': '42'},
+        ])
+        self.assertEqual([result['actual'] for result in results['results']], ['noise\n42', '42'])
+        self.assertTrue(results['all_passed'])
+
+    def test_tests_after_a_crash_report_that_they_did_not_run(self):
+        results = self.grade('', [
+            {'code': 'print(1)', 'expected': '1'},
+            {'code': 'import os\nos._exit(3)', 'expected': ''},
+            {'code': 'print(3)', 'expected': '3'},
+        ])
+        first, crashed, never_ran = results['results']
+        self.assertTrue(first['passed'])
+        self.assertFalse(crashed['passed'])
+        self.assertFalse(never_ran['passed'])
+        self.assertIn('error', never_ran)
+
+    def test_dead_runner_is_replaced(self):
+        tests = [{'code': 'print(1)', 'expected': '1'}]
+        self.pool.run('', tests)
+        runner = self.pool._idle.get_nowait()
+        runner.process.kill()
+        runner.process.wait()
+        self.pool._idle.put(runner)
+
+        result = self.pool.run('', tests)
+        self.assertTrue(result.tests[0]['passed'])
+        self.assertIsNot(self.pool._idle.get_nowait(), runner)
+
+    def test_runner_killed_mid_run_raises_and_is_discarded(self):
+        with self.assertRaises(SandboxError):
+            self.pool.run('import os, signal\nos.kill(os.getppid(), signal.SIGKILL)', [])
+        self.assertEqual(self.pool._idle.qsize(), 0)
+        self.assertTrue(self.pool.run('', [{'code': 'print(1)', 'expected': '1'}]).tests[0]['passed'])
+
+    def test_runners_are_recycled_after_max_runs(self):
+        self.pool.max_runs = 2
+        tests = [{'code': 'print(1)', 'expected': '1'}]
+        self.pool.run('', tests)
+        first = self.pool._idle.get_nowait()
+        self.pool._idle.put(first)
+        self.pool.run('', tests)
+        self.assertEqual(self.pool._idle.qsize(), 0)
+        self.assertFalse(first.is_alive())
+        self.pool.run('', tests)
+        self.assertIsNot(self.pool._idle.get_nowait(), first)
+
+
+class DjangoExerciseGradingTests(SimpleTestCase):
+    """Django/DRF exercises, graded in runners with Django preloaded"""
+
+    def setUp(self):
+        self.pool = configured_pool(size=1, max_runs=200, timeout=10, test_timeout=5, preload_django=True)
+        self.addCleanup(self.pool.close)
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+        self.exercise = next(e for e in get_module2_exercises() if e['lesson_slug'] == 'serializers')
+
+    def grade(self, code, models=''):
+        return run_exercise_tests(code, json.dumps(self.exercise['tests']), pool=self.pool, models=models)
+
+    def test_solution_passes_against_the_models_stub(self):
+        results = self.grade(self.exercise['solution'], self.exercise['models'])
+        self.assertTrue(results['all_passed'], results)
+
+    def test_undeclared_models_are_bare_placeholders(self):
+        results = self.grade(self.exercise['solution'])
+        self.assertFalse(results['all_passed'])
+        self.assertIn('ImproperlyConfigured', results['results'][0]['error'])
+
+    def test_models_stub_is_part_of_the_cache_key(self):
+        solution, tests_json = self.exercise['solution'], json.dumps(self.exercise['tests'])
+        self.grade(solution, self.exercise['models'])
+        self.assertIsNotNone(result_cache.get(result_cache.key(solution, tests_json, self.exercise['models'])))
+        self.assertIsNone(result_cache.get(result_cache.key(solution, tests_json)))
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class CatalogSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.lesson = create_lesson(quizzes=[(['a', 'b'], 0)])
+        self.quiz = self.lesson.quizzes.get()
+
+    def test_saving_content_rebuilds_the_snapshot(self):
+        self.assertEqual(get_catalog().quizzes_by_id[self.quiz.id].correct_answer, 0)
+        self.quiz.correct_answer = 1
+        self.quiz.save()
+        self.assertEqual(get_catalog().quizzes_by_id[self.quiz.id].correct_answer, 1)
+
+    def test_sees_changes_committed_by_another_process(self):
+        get_catalog()
+        # What populate_tutorial or another web worker leaves behind: new rows
+        # and a new version, with no signal in this process
+        Quiz.objects.filter(pk=self.quiz.pk).update(correct_answer=1)
+        CatalogVersion.objects.filter(pk=1).update(version='changed-elsewhere')
+        self.assertEqual(get_catalog().quizzes_by_id[self.quiz.id].correct_answer, 1)
+
+    @override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=60)
+    def test_version_is_read_at_most_once_per_interval(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            get_catalog()
+
+
+@override_settings(
+    LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_WRITE_BEHIND=False, PROGRESS_HEARTBEAT_MAX_SECONDS=600
+)
+class TimeTrackingTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = create_lesson()
+
+    def time_spent(self):
+        return UserProgress.objects.get(user=self.user, lesson=self.lesson).time_spent_seconds
+
+    def test_track_time_is_capped_like_a_heartbeat(self):
+        response = self.client.post(
+            f'/api/lessons/{self.lesson.id}/track_time/', {'time_spent_seconds': 10 ** 9},
+            content_type='application/json'
+        )
+        self.assertEqual(response.json(), {'total_time': 600})
+        self.client.post(
+            '/api/progress/heartbeat/', {'deltas': {str(self.lesson.id): 10 ** 9}}, content_type='application/json'
+        )
+        self.assertEqual(self.time_spent(), 1200)
+
+    def test_track_time_rejects_what_a_heartbeat_rejects(self):
+        for seconds in (-5, 'soon'):
+            response = self.client.post(
+                f'/api/lessons/{self.lesson.id}/track_time/', {'time_spent_seconds': seconds},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(
+                '/api/progress/heartbeat/', {'deltas': {str(self.lesson.id): seconds}},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserProgress.objects.filter(user=self.user).exists())
+
+
+class ProgressBufferTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.lesson = create_lesson()
+        self.buffer = ProgressBuffer()
+
+    def test_changes_to_one_lesson_coalesce(self):
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=30)
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=15, exercise_attempts=1,
+                        exercise_code='v1')
+        self.buffer.add(self.user.id, self.lesson.id, exercise_attempts=1, exercise_code='v2',
+                        exercise_completed=True)
+        self.assertEqual(len(self.buffer._pending), 1)
+        self.assertEqual(self.buffer.pending_time(self.user.id, self.lesson.id), 45)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        progress = UserProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.time_spent_seconds, 45)
+        self.assertEqual(progress.exercise_attempts, 2)
+        self.assertEqual(progress.exercise_code, 'v2')
+        self.assertTrue(progress.exercise_completed)
+
+    def test_flush_writes_each_change_once(self):
+        UserProgress.objects.create(
+            user=self.user, lesson=self.lesson, time_spent_seconds=100, exercise_code='kept'
+        )
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=20)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.pending_time(self.user.id, self.lesson.id), 0)
+
+        progress = UserProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.time_spent_seconds, 120)
+        self.assertEqual(progress.exercise_code, 'kept')
+        rollup = ModuleProgress.objects.get(user=self.user, module=self.lesson.module)
+        self.assertEqual(rollup.time_spent_seconds, 120)
+
+    def test_failed_flush_keeps_changes_for_the_next(self):
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=20)
+        with mock.patch.object(UserProgress.objects, 'bulk_update', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.buffer.flush()
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=5)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(UserProgress.objects.get(user=self.user, lesson=self.lesson).time_spent_seconds, 25)
+
+    def test_changes_to_deleted_lessons_are_dropped(self):
+        self.buffer.add(self.user.id, self.lesson.id, time_spent_seconds=20)
+        self.lesson.delete()
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertFalse(UserProgress.objects.exists())
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class ModuleRollupTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = create_lesson()
+        self.progress = UserProgress.objects.create(user=self.user, lesson=self.lesson, time_spent_seconds=60)
+
+    def summary(self):
+        return self.client.get('/api/progress/summary/').json()
+
+    def test_progress_api_updates_refresh_the_summary(self):
+        response = self.client.patch(
+            f'/api/progress/{self.progress.id}/', {'completed': True}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        summary = self.summary()
+        self.assertEqual((summary['completed_lessons'], summary['total_time_seconds']), (1, 60))
+
+        self.client.delete(f'/api/progress/{self.progress.id}/')
+        summary = self.summary()
+        self.assertEqual((summary['completed_lessons'], summary['total_time_seconds']), (0, 0))
+
+    def test_admin_changes_refresh_the_summary(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.client.post(f'/admin/lessons/userprogress/{self.progress.id}/change/', {
+            'user': self.user.id, 'lesson': self.lesson.id, 'completed': 'on',
+            'exercise_attempts': 0, 'exercise_code': '', 'time_spent_seconds': 90,
+        })
+        rollup = ModuleProgress.objects.get(user=self.user, module=self.lesson.module)
+        self.assertEqual((rollup.completed_lessons, rollup.time_spent_seconds), (1, 90))
+
+    def test_complete_refreshes_the_summary(self):
+        other = create_lesson(slug='next')
+        self.client.post(f'/api/lessons/{other.id}/complete/')
+        self.client.post(f'/api/lessons/{self.lesson.id}/complete/')
+        self.assertEqual(self.summary()['completed_lessons'], 2)
+
+    def test_deleting_the_user_deletes_their_rollups(self):
+        self.user.delete()
+        self.assertFalse(ModuleProgress.objects.exists())
+
+
+def course_data():
+    """A two-lesson course in the shape of lessons.content.load_course()"""
+    def lesson(slug, order, quizzes):
+        return {
+            'slug': slug, 'title': slug.title(), 'order': order, 'content': f'# {slug}',
+            'django_code': '', 'dotnet_code': '', 'has_exercise': False,
+            'exercise_starter_code': '', 'exercise_solution': '', 'exercise_tests': '', 'exercise_models': '',
+            'quizzes': [
+                {'order': order, 'question': question, 'options': ['a', 'b'], 'correct_answer': 0,
+                 'explanation': 'Because'}
+                for order, question in enumerate(quizzes)
+            ],
+        }
+
+    return [{
+        'slug': 'basics', 'title': 'Basics', 'description': 'Start here', 'order': 1,
+        'estimated_minutes': 30, 'dotnet_comparison': '',
+        'lessons': [lesson('intro', 1, ['Why?', 'How?']), lesson('models', 2, ['What?'])],
+    }]
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class ContentSyncTests(TestCase):
+
+    def setUp(self):
+        self.course = course_data()
+        sync_course(self.course)
+
+    def test_first_sync_creates_everything(self):
+        self.assertEqual(Module.objects.count(), 1)
+        self.assertEqual(
+            list(Lesson.objects.order_by('order').values_list('slug', flat=True)), ['intro', 'models']
+        )
+        self.assertEqual(Quiz.objects.count(), 3)
+        self.assertIn('<h1', Lesson.objects.get(slug='intro').content_html)
+
+    def test_resync_is_a_no_op(self):
+        version = CatalogVersion.objects.get().version
+        updated_at = list(Lesson.objects.order_by('id').values_list('updated_at', flat=True))
+        self.assertEqual(sync_course(course_data(), prune=True), [])
+        self.assertEqual(list(Lesson.objects.order_by('id').values_list('updated_at', flat=True)), updated_at)
+        self.assertEqual(CatalogVersion.objects.get().version, version)
+
+    def test_edited_lesson_is_updated_in_place(self):
+        user = User.objects.create_user('learner')
+        lesson = Lesson.objects.get(slug='intro')
+        progress = UserProgress.objects.create(user=user, lesson=lesson, completed=True)
+        quiz_ids = set(lesson.quizzes.values_list('id', flat=True))
+
+        self.course[0]['lessons'][0]['content'] = '# Introduction'
+        self.course[0]['lessons'][0]['quizzes'][1]['correct_answer'] = 1
+        changes = sync_course(self.course)
+
+        self.assertEqual(
+            [(change.action, change.kind, change.key, change.fields) for change in changes],
+            [('update', 'lesson', 'basics/intro', ['content']),
+             ('update', 'quiz', 'basics/intro/1', ['correct_answer'])]
+        )
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.content, '# Introduction')
+        self.assertIn('Introduction', lesson.content_html)
+        self.assertEqual(set(lesson.quizzes.values_list('id', flat=True)), quiz_ids)
+        self.assertEqual(UserProgress.objects.get(pk=progress.pk).lesson_id, lesson.id)
+        self.assertEqual(get_catalog().lessons_by_id[lesson.id].content, '# Introduction')
+
+    def test_without_update_differences_are_only_reported(self):
+        self.course[0]['lessons'][0]['content'] = '# Introduction'
+        changes = sync_course(self.course, update=False)
+        self.assertEqual([(change.action, change.key) for change in changes], [('outdated', 'basics/intro')])
+        self.assertEqual(Lesson.objects.get(slug='intro').content, '# intro')
+
+    def test_removed_items_are_deleted_with_prune(self):
+        user = User.objects.create_user('learner')
+        UserProgress.objects.create(user=user, lesson=Lesson.objects.get(slug='models'))
+        del self.course[0]['lessons'][1]
+        del self.course[0]['lessons'][0]['quizzes'][1]
+
+        self.assertEqual(sync_course(self.course), [])
+        changes = sync_course(self.course, prune=True)
+        self.assertEqual(
+            sorted((change.action, change.kind, change.key) for change in changes),
+            [('delete', 'lesson', 'basics/models'), ('delete', 'quiz', 'basics/intro/1'),
+             ('delete', 'quiz', 'basics/models/0')]
+        )
+        self.assertEqual(list(Lesson.objects.values_list('slug', flat=True)), ['intro'])
+        self.assertEqual(Quiz.objects.count(), 1)
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_module_changes_are_keyed_by_slug(self):
+        self.course[0]['description'] = 'Start here first'
+        changes = sync_course(self.course)
+        self.assertEqual(
+            [(change.action, change.kind, change.key, change.fields) for change in changes],
+            [('update', 'module', 'basics', ['description'])]
+        )
+        self.course.append(dict(self.course[0], slug='extras', lessons=[]))
+        self.assertEqual([change.key for change in sync_course(self.course)], ['extras'])
+        del self.course[1]
+        self.assertEqual([change.key for change in sync_course(self.course, prune=True)], ['extras'])
+
+    def test_dry_run_saves_nothing(self):
+        self.course[0]['lessons'].append(dict(self.course[0]['lessons'][1], slug='views', order=3))
+        changes = sync_course(self.course, dry_run=True)
+        self.assertIn(('create', 'lesson', 'basics/views'), [(c.action, c.kind, c.key) for c in changes])
+        self.assertFalse(Lesson.objects.filter(slug='views').exists())
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class QuizBatchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = create_lesson(quizzes=[(['a', 'b', 'c'], 2), (['yes', 'no'], 0)])
+        self.first, self.second = self.lesson.quizzes.order_by('order')
+
+    def submit(self, answers, lesson=None):
+        return self.client.post('/api/submit-quizzes/', {
+            'lesson_id': (lesson or self.lesson).id,
+            'answers': [{'quiz': quiz.id, 'selected_answer': answer} for quiz, answer in answers],
+        }, content_type='application/json')
+
+    def test_scores_correct_and_incorrect_answers(self):
+        response = self.submit([(self.first, 2), (self.second, 1)])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['correct'], body['total']), (1, 2))
+        self.assertEqual(
+            [(result['quiz'], result['is_correct'], result['correct_answer']) for result in body['results']],
+            [(self.first.id, True, 2), (self.second.id, False, 0)]
+        )
+        attempts = UserQuizAttempt.objects.filter(user=self.user)
+        self.assertEqual(
+            set(attempts.values_list('quiz_id', 'selected_answer', 'is_correct')),
+            {(self.first.id, 2, True), (self.second.id, 1, False)}
+        )
+
+    def test_rejects_a_quiz_from_another_lesson(self):
+        other = create_lesson(slug='other', quizzes=[(['a', 'b'], 1)]).quizzes.get()
+        response = self.submit([(self.first, 2), (other, 1)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('answers', response.json())
+        self.assertFalse(UserQuizAttempt.objects.exists())
+
+    def test_rejects_answering_a_quiz_twice(self):
+        self.assertEqual(self.submit([(self.first, 2), (self.first, 1)]).status_code, 400)
+
+    def test_scores_against_an_edited_answer(self):
+        self.assertTrue(self.submit([(self.first, 2)]).json()['results'][0]['is_correct'])
+        self.first.correct_answer = 1
+        self.first.save()
+        result = self.submit([(self.first, 2)]).json()['results'][0]
+        self.assertEqual((result['is_correct'], result['correct_answer']), (False, 1))
+
+    def test_scores_against_an_answer_edited_by_another_process(self):
+        self.submit([(self.first, 2)])
+        Quiz.objects.filter(pk=self.first.pk).update(correct_answer=1)
+        CatalogVersion.objects.filter(pk=1).update(version='changed-elsewhere')
+        self.assertTrue(self.submit([(self.first, 1)]).json()['results'][0]['is_correct'])
+
+    def test_anonymous_answers_are_scored_but_not_saved(self):
+        self.client.logout()
+        self.assertEqual(self.submit([(self.first, 2)]).json()['correct'], 1)
+        self.assertFalse(UserQuizAttempt.objects.exists())
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class QuizAttemptSummaryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = create_lesson(quizzes=[(['a', 'b', 'c'], 2), (['yes', 'no'], 0)])
+        self.first, self.second = self.lesson.quizzes.order_by('order')
+
+    def submit_one(self, quiz, answer):
+        self.client.post('/api/submit-quiz/', {'quiz': quiz.id, 'selected_answer': answer},
+                         content_type='application/json')
+
+    def submit_batch(self, answers):
+        self.client.post('/api/submit-quizzes/', {
+            'lesson_id': self.lesson.id,
+            'answers': [{'quiz': quiz.id, 'selected_answer': answer} for quiz, answer in answers],
+        }, content_type='application/json')
+
+    def assertSummariesMatchAttempts(self):
+        expected = {}
+        for attempt in UserQuizAttempt.objects.order_by('attempted_at', 'id'):
+            summary = expected.setdefault((attempt.user_id, attempt.quiz_id), {
+                'attempts': 0, 'first_attempted_at': attempt.attempted_at, 'first_correct_at': None,
+            })
+            summary['attempts'] += 1
+            if attempt.is_correct and summary['first_correct_at'] is None:
+                summary['first_correct_at'] = attempt.attempted_at
+            summary.update(
+                last_answer=attempt.selected_answer, last_is_correct=attempt.is_correct,
+                last_attempted_at=attempt.attempted_at
+            )
+        actual = {
+            (row.pop('user_id'), row.pop('quiz_id')): row
+            for row in QuizAttemptSummary.objects.values(
+                'user_id', 'quiz_id', 'attempts', 'first_attempted_at', 'first_correct_at',
+                'last_answer', 'last_is_correct', 'last_attempted_at'
+            )
+        }
+        self.assertEqual(actual, expected)
+
+    def test_single_and_batch_submissions_keep_summaries_in_step(self):
+        self.submit_one(self.first, 0)
+        self.submit_batch([(self.first, 2), (self.second, 1)])
+        self.submit_one(self.first, 1)
+        self.assertSummariesMatchAttempts()
+
+        summary = QuizAttemptSummary.objects.get(user=self.user, quiz=self.first)
+        self.assertEqual((summary.attempts, summary.last_answer, summary.last_is_correct), (3, 1, False))
+        self.assertIsNotNone(summary.first_correct_at)
+        by_quiz = self.client.get(f'/api/progress/quizzes/?lesson={self.lesson.id}').json()
+        self.assertEqual(by_quiz[str(self.first.id)]['attempts'], 3)
+
+    def test_admin_deletes_refresh_summaries(self):
+        self.submit_one(self.first, 2)
+        self.submit_one(self.first, 0)
+        self.submit_one(self.second, 0)
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+        latest = UserQuizAttempt.objects.filter(quiz=self.first).order_by('-attempted_at', '-id').first()
+        self.client.post(f'/admin/lessons/userquizattempt/{latest.id}/delete/', {'post': 'yes'})
+        self.assertFalse(UserQuizAttempt.objects.filter(pk=latest.pk).exists())
+        self.assertSummariesMatchAttempts()
+        self.assertTrue(QuizAttemptSummary.objects.get(quiz=self.first).last_is_correct)
+
+        attempt = UserQuizAttempt.objects.get(quiz=self.second)
+        self.client.post(f'/admin/lessons/userquizattempt/{attempt.id}/change/', {
+            'user': self.user.id, 'quiz': self.first.id, 'selected_answer': 1, 'is_correct': '',
+        })
+        self.assertSummariesMatchAttempts()
+        self.assertFalse(QuizAttemptSummary.objects.filter(quiz=self.second).exists())
+
+        self.client.post('/admin/lessons/userquizattempt/', {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': list(UserQuizAttempt.objects.values_list('id', flat=True)),
+        })
+        self.assertFalse(UserQuizAttempt.objects.exists())
+        self.assertFalse(QuizAttemptSummary.objects.exists())
+
+
+def grow_catalog(modules, lessons_per_module, user=None):
+    """Add modules of lessons (each with a quiz and a snippet), and progress on them for user"""
+    start = Module.objects.count()
+    for m in range(start, start + modules):
+        module_slug = f'module-{m}'
+        for n in range(lessons_per_module):
+            lesson = create_lesson(module_slug, f'lesson-{n}', quizzes=[(['a', 'b'], 0)])
+            CodeSnippet.objects.create(lesson=lesson, title='Snippet', language='python', code='pass')
+            if user is not None:
+                UserProgress.objects.create(user=user, lesson=lesson, completed=n % 2 == 0)
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class CatalogQueryCountTests(TestCase):
+    """The module endpoints cost the same number of queries however large the catalog is"""
+
+    # Session, user, catalog version, the user's progress rows
+    QUERIES = 4
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+
+    def assertConstantQueries(self, url):
+        for modules, lessons in ((1, 2), (4, 5)):
+            grow_catalog(modules, lessons, self.user)
+            self.client.get(url)  # rebuild the snapshot for the new catalog
+            with self.assertNumQueries(self.QUERIES):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_module_list(self):
+        self.assertConstantQueries('/api/modules/')
+
+    def test_module_detail(self):
+        self.assertConstantQueries('/api/modules/module-0/')
+
+
+class ProgressSummaryQueryCountTests(TestCase):
+    """The progress summary costs two queries (plus auth) however large the course is"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+
+    def test_progress_by_module(self):
+        for modules, lessons in ((1, 2), (4, 5)):
+            grow_catalog(modules, lessons, self.user)
+            for live in (False, True):
+                with self.subTest(modules=Module.objects.count(), live=live), self.assertNumQueries(2):
+                    by_module = progress_by_module(self.user, live=live)
+            self.assertEqual(len(by_module), Module.objects.count())
+            self.assertEqual(
+                sum(module['completed_lessons'] for module in by_module),
+                UserProgress.objects.filter(user=self.user, completed=True).count()
+            )
+
+    def test_summary_endpoint(self):
+        for modules, lessons in ((1, 2), (4, 5)):
+            grow_catalog(modules, lessons, self.user)
+            # Session and user, then modules and the user's rollup rows
+            with self.assertNumQueries(4):
+                summary = self.client.get('/api/progress/summary/').json()
+            self.assertEqual(summary['total_lessons'], Lesson.objects.count())
+            self.assertEqual(len(summary['modules_progress']), Module.objects.count())
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=60)
+class CatalogCacheTests(TestCase):
+    """Anonymous catalog responses come from the shared cache (lessons/cache.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.lesson = create_lesson()
+        # Start from a version this process has read back
+        bump_catalog_version()
+
+    def test_cache_hit_runs_no_queries(self):
+        first = self.client.get('/api/modules/')
+        self.assertTrue(first.has_header('ETag'))
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/modules/')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_gets_not_modified(self):
+        for url in ('/api/modules/', '/api/modules/basics/', f'/api/lessons/{self.lesson.id}/'):
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_saving_content_bumps_the_version_and_invalidates(self):
+        version = CatalogVersion.objects.get().version
+        first = self.client.get('/api/modules/')
+        self.lesson.title = 'Renamed'
+        self.lesson.save()
+        self.assertNotEqual(CatalogVersion.objects.get().version, version)
+
+        second = self.client.get('/api/modules/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json()[0]['lessons'][0]['title'], 'Renamed')
+
+    def test_deleting_content_invalidates(self):
+        create_lesson(slug='second')
+        self.client.get('/api/modules/')
+        Lesson.objects.get(slug='second').delete()
+        self.assertEqual(len(self.client.get('/api/modules/').json()[0]['lessons']), 1)
+
+    def test_per_user_responses_bypass_the_cache(self):
+        self.client.get('/api/modules/')
+        self.client.force_login(User.objects.create_user('learner'))
+        response = self.client.get('/api/modules/')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('completed_lessons', response.json()[0])
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class ProgressOverlayTests(TestCase):
+    """?include_progress=false serves content only; the overlay carries the per-user part"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = create_lesson()
+        UserProgress.objects.create(user=self.user, lesson=self.lesson, completed=True, time_spent_seconds=30)
+
+    def test_catalog_includes_progress_by_default(self):
+        module = self.client.get('/api/modules/').json()[0]
+        self.assertEqual((module['completed_lessons'], module['progress_percentage']), (1, 100))
+        lesson = self.client.get(f'/api/lessons/{self.lesson.id}/').json()
+        self.assertTrue(lesson['is_completed'])
+        self.assertEqual(lesson['progress']['time_spent_seconds'], 30)
+
+    def test_include_progress_false_drops_per_user_fields(self):
+        module = self.client.get('/api/modules/?include_progress=false').json()[0]
+        self.assertNotIn('completed_lessons', module)
+        self.assertNotIn('progress_percentage', module)
+        self.assertEqual(module['total_lessons'], 1)
+        detail = self.client.get(f'/api/lessons/{self.lesson.id}/?include_progress=0').json()
+        for lesson in (module['lessons'][0], detail):
+            self.assertNotIn('is_completed', lesson)
+            self.assertNotIn('progress', lesson)
+            self.assertEqual(lesson['title'], 'Intro')
+
+    def test_overlay_returns_progress_by_lesson(self):
+        overlay = self.client.get('/api/progress/overlay/').json()
+        self.assertEqual(list(overlay), [str(self.lesson.id)])
+        entry = overlay[str(self.lesson.id)]
+        self.assertEqual(
+            {key: entry[key] for key in ('completed', 'exercise_completed', 'time_spent_seconds')},
+            {'completed': True, 'exercise_completed': False, 'time_spent_seconds': 30}
+        )
+        self.assertIn('last_accessed', entry)
+
+    def test_overlay_is_empty_for_anonymous_users(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/progress/overlay/').json(), {})
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class ModuleOutlineTests(TestCase):
+
+    def setUp(self):
+        self.lesson = create_lesson(quizzes=[(['a', 'b'], 0), (['c', 'd'], 1)])
+        self.lesson.content = '# A long lesson body'
+        self.lesson.save()
+        CodeSnippet.objects.create(lesson=self.lesson, title='Snippet', language='python', code='pass')
+
+    def test_outline_omits_lesson_bodies_and_keeps_counts(self):
+        self.client.force_login(User.objects.create_user('learner'))
+        module = self.client.get('/api/modules/?view=outline').json()[0]
+        self.assertEqual(module['total_lessons'], 1)
+        self.assertNotIn('completed_lessons', module)
+        self.assertEqual(module['lessons'], [{
+            'id': self.lesson.id, 'title': 'Intro', 'slug': 'intro', 'order': 0,
+            'has_exercise': False, 'quiz_count': 2, 'snippet_count': 1,
+        }])
+
+    def test_full_view_still_includes_bodies(self):
+        lesson = self.client.get('/api/modules/').json()[0]['lessons'][0]
+        self.assertEqual(lesson['content'], '# A long lesson body')
+        self.assertEqual(len(lesson['quizzes']), 2)
+        self.assertEqual(len(lesson['snippets']), 1)
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class LessonRenderingTests(TestCase):
+
+    def setUp(self):
+        self.lesson = create_lesson()
+        self.lesson.content = '# Models\n\n<script>alert(1)</script>\n\n```python\nx = 1\n```\n'
+        self.lesson.django_code = 'class Book(models.Model):\n    pass\n'
+        self.lesson.save()
+
+    def test_saving_renders_sanitized_html(self):
+        self.lesson.refresh_from_db()
+        self.assertIn('<h1>Models</h1>', self.lesson.content_html)
+        self.assertIn('class="codehilite"', self.lesson.content_html)
+        self.assertNotIn('<script', self.lesson.content_html)
+        self.assertIn('<span class="k">class</span>', self.lesson.django_code_html)
+        self.assertEqual(self.lesson.dotnet_code_html, '')
+
+    def test_saving_some_fields_still_renders(self):
+        self.lesson.content = '# Views'
+        self.lesson.save(update_fields=['content'])
+        self.lesson.refresh_from_db()
+        self.assertIn('<h1>Views</h1>', self.lesson.content_html)
+
+    def test_html_fields_only_with_html_true(self):
+        html_fields = {'content_html', 'django_code_html', 'dotnet_code_html'}
+        url = f'/api/lessons/{self.lesson.id}/'
+        self.assertFalse(html_fields & set(self.client.get(url).json()))
+        lesson = self.client.get(url + '?html=true').json()
+        self.assertTrue(html_fields <= set(lesson))
+        self.assertIn('<h1>Models</h1>', lesson['content_html'])
+        module_lesson = self.client.get('/api/modules/?html=true').json()[0]['lessons'][0]
+        self.assertEqual(module_lesson['content_html'], lesson['content_html'])
+
+    def test_stylesheet_only_styles_highlighted_code(self):
+        for rule in stylesheet().splitlines():
+            self.assertTrue(rule.startswith(('.codehilite', 'code.highlighted')), rule)
+
+
+def exercise_lesson():
+    """A lesson whose exercise checks add(a, b)"""
+    lesson = create_lesson(slug='functions')
+    lesson.has_exercise = True
+    lesson.exercise_tests = json.dumps([
+        {'code': 'print(add(1, 2))', 'expected': '3'},
+        {'code': 'print(add(2, 2))', 'expected': '4'},
+    ])
+    lesson.save()
+    return lesson
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True, CELERY_RESULT_BACKEND='cache+memory://',
+    LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_WRITE_BEHIND=False
+)
+class AsyncExerciseTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = exercise_lesson()
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
+    def submit(self, code='def add(a, b):\n    return a + b\n'):
+        return self.client.post(
+            '/api/submit-exercise/?async=true', {'lesson_id': self.lesson.id, 'code': code},
+            content_type='application/json'
+        )
+
+    def test_submit_then_poll_until_done(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        job_id = response.json()['job_id']
+        result = self.client.get(f'/api/exercise-results/{job_id}/').json()
+        self.assertEqual((result['job_id'], result['status']), (job_id, 'done'))
+        self.assertTrue(result['result']['all_passed'])
+        self.assertEqual(len(result['result']['results']), 2)
+
+        progress = UserProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.exercise_attempts, 1)
+        self.assertTrue(progress.exercise_completed)
+
+    def test_unknown_job_is_not_found(self):
+        response = self.client.get('/api/exercise-results/0f1e2d3c-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_other_users_cannot_read_a_job(self):
+        job_id = self.submit().json()['job_id']
+        self.client.force_login(User.objects.create_user('someone-else'))
+        self.assertEqual(self.client.get(f'/api/exercise-results/{job_id}/').status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(f'/api/exercise-results/{job_id}/').status_code, 404)
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, EXERCISE_BATCH_MAX_SIZE=3)
+class ExerciseBatchTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.lesson = exercise_lesson()
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
+    def post(self, submissions):
+        return self.client.post(
+            '/api/submit-exercises/', {'submissions': submissions}, content_type='application/json'
+        )
+
+    def test_streams_one_line_per_submission(self):
+        response = self.post([
+            {'lesson_id': self.lesson.id, 'code': 'def add(a, b):\n    return a + b\n'},
+            {'lesson_id': self.lesson.id, 'code': 'def add(a, b):\n    return a - b\n'},
+        ])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        results = {line['index']: line for line in lines}
+        self.assertEqual(sorted(results), [0, 1])
+        self.assertEqual({line['lesson_id'] for line in lines}, {self.lesson.id})
+        self.assertTrue(results[0]['all_passed'])
+        self.assertFalse(results[1]['all_passed'])
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_reports_errors_per_submission(self):
+        no_exercise = create_lesson(slug='reading')
+        get_catalog()
+        # Session, user and catalog version; the lessons come from the snapshot
+        with self.assertNumQueries(3):
+            response = self.post([
+                {'lesson_id': self.lesson.id, 'code': 'pass'},
+                {'lesson_id': no_exercise.id, 'code': 'pass'},
+                {'lesson_id': 999999, 'code': 'pass'},
+            ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'submissions': {
+            '1': 'This lesson does not have an exercise.',
+            '2': 'Lesson not found.',
+        }})
+
+    def test_rejects_batches_over_the_cap(self):
+        response = self.post([{'lesson_id': self.lesson.id, 'code': 'pass'}] * 4)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'submissions': ['At most 3 submissions per batch.']})
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user('learner'))
+        self.assertEqual(self.post([{'lesson_id': self.lesson.id, 'code': 'pass'}]).status_code, 403)
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_WRITE_BEHIND=False)
+class ExerciseStreamTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.lesson = exercise_lesson()
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
+    def submit(self):
+        return self.client.post(
+            '/api/submit-exercise/stream/',
+            {'lesson_id': self.lesson.id, 'code': 'def add(a, b):\n    return a + b\n'},
+            content_type='application/json'
+        )
+
+    def parse(self, chunk):
+        event, data = chunk.decode().strip().split('\n')
+        return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+    def test_streams_each_test_then_the_summary(self):
+        response = self.submit()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = [self.parse(chunk) for chunk in response.streaming_content]
+        self.assertEqual([event for event, _ in events], ['test', 'test', 'summary'])
+        self.assertEqual(sorted(data['index'] for event, data in events[:2]), [0, 1])
+        self.assertTrue(events[-1][1]['all_passed'])
+
+        progress = UserProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.exercise_attempts, 1)
+        self.assertTrue(progress.exercise_completed)
+
+    def test_attempt_is_recorded_when_the_client_disconnects(self):
+        response = self.submit()
+        self.assertEqual(self.parse(next(iter(response.streaming_content)))[0], 'test')
+        response.close()
+        progress = UserProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.exercise_attempts, 1)
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_WRITE_BEHIND=False)
+class AsyncViewParityTests(TestCase):
+    """The native async endpoints answer exactly like their DRF counterparts"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        grow_catalog(2, 2, user=self.user)
+        self.lesson = Lesson.objects.get(module__slug='module-0', slug='lesson-0')
+        self.lesson.content = '# Intro'
+        self.lesson.save()
+        UserProgress.objects.filter(user=self.user).update(time_spent_seconds=90)
+
+    async def assertSamePayload(self, async_url, drf_url):
+        async_response = await self.async_client.get(async_url)
+        drf_response = await self.async_client.get(drf_url)
+        self.assertEqual(async_response.status_code, drf_response.status_code)
+        self.assertEqual(async_response.json(), drf_response.json())
+
+    async def test_module_outline(self):
+        await self.assertSamePayload('/api/async/modules/', '/api/modules/?view=outline&include_progress=false')
+
+    async def test_lesson_detail(self):
+        await self.async_client.aforce_login(self.user)
+        for query in ('', '?html=true', '?include_progress=false'):
+            with self.subTest(query=query):
+                await self.assertSamePayload(
+                    f'/api/async/lessons/{self.lesson.id}/{query}', f'/api/lessons/{self.lesson.id}/{query}'
+                )
+
+    async def test_lesson_detail_anonymous(self):
+        await self.assertSamePayload(f'/api/async/lessons/{self.lesson.id}/', f'/api/lessons/{self.lesson.id}/')
+
+    async def test_missing_lesson(self):
+        self.assertEqual((await self.async_client.get('/api/async/lessons/999999/')).status_code, 404)
+
+    async def test_progress_summary(self):
+        await self.async_client.aforce_login(self.user)
+        await self.assertSamePayload('/api/async/progress/summary/', '/api/progress/summary/')
+
+    async def test_progress_summary_needs_a_user(self):
+        response = await self.async_client.get('/api/async/progress/summary/')
+        self.assertEqual(response.status_code, 403)
+        await self.assertSamePayload('/api/async/progress/summary/', '/api/progress/summary/')
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class ProgressImportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.intro = create_lesson(slug='intro')
+        self.models = create_lesson(slug='models')
+        UserProgress.objects.create(user=self.user, lesson=self.intro, time_spent_seconds=30)
+
+    def post(self, progress):
+        return self.client.post('/api/import-progress/', {'progress': progress}, content_type='application/json')
+
+    def test_reports_an_outcome_per_entry(self):
+        response = self.post({
+            str(self.intro.id): {'completed': True, 'time_spent_seconds': 300},
+            str(self.models.id): {'completed': True, 'exercise_completed': True},
+            'intro': {'completed': True},
+            str(self.models.id + 1000): {'completed': True},
+        })
+        body = response.json()
+        self.assertEqual(body['results'], {
+            str(self.intro.id): 'updated',
+            str(self.models.id): 'created',
+            'intro': 'invalid',
+            str(self.models.id + 1000): 'unknown_lesson',
+        })
+        self.assertEqual(body['imported'], 2)
+        self.assertEqual(list(body['errors']), ['intro'])
+
+        intro = UserProgress.objects.get(user=self.user, lesson=self.intro)
+        self.assertEqual((intro.completed, intro.time_spent_seconds), (True, 300))
+        self.assertTrue(UserProgress.objects.get(user=self.user, lesson=self.models).exercise_completed)
+        rollup = ModuleProgress.objects.get(user=self.user, module=self.intro.module)
+        self.assertEqual((rollup.completed_lessons, rollup.time_spent_seconds), (2, 300))
+
+    def test_invalid_values_are_reported_not_imported(self):
+        body = self.post({str(self.models.id): {'time_spent_seconds': -5}}).json()
+        self.assertEqual(body['results'], {str(self.models.id): 'invalid'})
+        self.assertIn('time_spent_seconds', body['errors'][str(self.models.id)])
+        self.assertFalse(UserProgress.objects.filter(lesson=self.models).exists())
+
+    def test_upsert_is_one_transaction(self):
+        with mock.patch('lessons.progress.refresh_module_progress', side_effect=DatabaseError), \
+                self.assertRaises(DatabaseError):
+            self.post({
+                str(self.intro.id): {'completed': True, 'time_spent_seconds': 300},
+                str(self.models.id): {'completed': True},
+            })
+        self.assertEqual(UserProgress.objects.get(lesson=self.intro).time_spent_seconds, 30)
+        self.assertFalse(UserProgress.objects.filter(lesson=self.models).exists())
+
+    def test_requires_a_user(self):
+        self.client.logout()
+        self.assertEqual(self.post({str(self.intro.id): {'completed': True}}).status_code, 401)
+
+
+def learner_with_history(username, lessons):
+    """A user with progress on each lesson and one attempt at each of its quizzes"""
+    user = User.objects.create_user(username)
+    for lesson in lessons:
+        UserProgress.objects.create(user=user, lesson=lesson, completed=True, time_spent_seconds=60)
+        for quiz in lesson.quizzes.all():
+            UserQuizAttempt.objects.create(user=user, quiz=quiz, selected_answer=0, is_correct=True)
+    return user
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_EXPORT_CHUNK_SIZE=1)
+class JsonlExportTests(TestCase):
+
+    def setUp(self):
+        lessons = [
+            create_lesson(slug='intro', quizzes=[(['a', 'b'], 0), (['a', 'b'], 1)]),
+            create_lesson(slug='models', quizzes=[(['a', 'b'], 0)]),
+        ]
+        self.user = learner_with_history('learner', lessons)
+        learner_with_history('someone-else', lessons)
+
+    def export(self):
+        response = self.client.get('/api/export-progress/stream/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="progress.jsonl"')
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_one_line_per_record(self):
+        self.client.force_login(self.user)
+        lines = self.export()
+        self.assertEqual(lines[0], {'type': 'user', 'user': 'learner'})
+        self.assertEqual([line['type'] for line in lines[1:]], ['progress'] * 2 + ['quiz_attempt'] * 3)
+
+    def test_same_records_as_the_json_export(self):
+        self.client.force_login(self.user)
+        document = self.client.get('/api/export-progress/').json()
+        lines = self.export()
+        progress = {str(line['lesson']): line for line in lines if line.pop('type') == 'progress'}
+        self.assertEqual(progress, document['progress'])
+        by_quiz = itemgetter('quiz_id')
+        self.assertEqual(sorted(lines[-3:], key=by_quiz), sorted(document['quiz_attempts'], key=by_quiz))
+
+    def test_anonymous_export_is_just_the_user_line(self):
+        self.assertEqual(self.export(), [{'type': 'user', 'user': 'anonymous'}])
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0, PROGRESS_EXPORT_CHUNK_SIZE=2)
+class CsvExportTests(TestCase):
+
+    def setUp(self):
+        self.lessons = [
+            create_lesson(slug='intro', quizzes=[(['a', 'b'], 0), (['a', 'b'], 1)]),
+            create_lesson(slug='models', quizzes=[(['a', 'b'], 0)]),
+            create_lesson(slug='views'),
+        ]
+        for username in ('ada', 'grace', 'linus'):
+            learner_with_history(username, self.lessons[:2])
+
+    def read_csv(self, text):
+        return list(csv.reader(io.StringIO(text)))
+
+    def export_cohort(self, *args):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        call_command('export_cohort', *args, output_dir=output_dir, stdout=io.StringIO())
+        return output_dir
+
+    def test_export_cohort_writes_every_dataset(self):
+        output_dir = self.export_cohort()
+        expected = {
+            'progress': ([column for column, _ in PROGRESS_CSV_COLUMNS], 6),
+            'quiz_attempts': ([column for column, _ in QUIZ_ATTEMPT_CSV_COLUMNS], 9),
+            'lessons': (LESSON_CSV_HEADER, 3),
+        }
+        for name, (expected_header, row_count) in expected.items():
+            with self.subTest(dataset=name), open(os.path.join(output_dir, f'{name}.csv'), newline='') as f:
+                header, *rows = self.read_csv(f.read())
+                self.assertEqual(header, expected_header)
+                self.assertEqual(len(rows), row_count)
+
+    def test_lesson_totals(self):
+        with open(os.path.join(self.export_cohort('lessons'), 'lessons.csv'), newline='') as f:
+            rows = {row['lesson']: row for row in csv.DictReader(f)}
+        columns = ('learners', 'completed', 'average_time_seconds', 'quiz_attempts')
+        self.assertEqual([rows['intro'][column] for column in columns], ['3', '3', '60', '6'])
+        self.assertEqual((rows['views']['learners'], rows['views']['quiz_attempts']), ('0', '0'))
+
+    def test_export_cohort_gzip(self):
+        output_dir = self.export_cohort('progress', '--gzip')
+        self.assertEqual(os.listdir(output_dir), ['progress.csv.gz'])
+        with gzip.open(os.path.join(output_dir, 'progress.csv.gz'), 'rt', newline='') as f:
+            self.assertEqual(len(self.read_csv(f.read())), 7)
+
+    def test_export_cohort_rejects_unknown_datasets(self):
+        with self.assertRaisesMessage(CommandError, 'Unknown dataset(s): grades'):
+            self.export_cohort('progress', 'grades')
+
+    def test_admin_actions_export_the_selection(self):
+        self.client.force_login(User.objects.create_superuser('admin'))
+        cases = [
+            ('userprogress', UserProgress.objects.filter(user__username='ada'), PROGRESS_CSV_COLUMNS),
+            ('userquizattempt', UserQuizAttempt.objects.filter(user__username='grace'), QUIZ_ATTEMPT_CSV_COLUMNS),
+        ]
+        for model, selected, columns in cases:
+            with self.subTest(model=model):
+                response = self.client.post(f'/admin/lessons/{model}/', {
+                    'action': 'export_csv', '_selected_action': [obj.pk for obj in selected],
+                })
+                self.assertEqual(response['Content-Type'], 'text/csv')
+                header, *rows = self.read_csv(b''.join(response.streaming_content).decode())
+                self.assertEqual(header, [column for column, _ in columns])
+                self.assertEqual(len(rows), selected.count())
+                self.assertEqual({row[header.index('username')] for row in rows}, {selected[0].user.username})
+
+
+@override_settings(LESSONS_CATALOG_VERSION_CHECK_SECONDS=0)
+class PopulateTutorialTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'course.bundle')
+        write_bundle(course_data(), self.path)
+
+    def populate(self, *args, **options):
+        output = io.StringIO()
+        call_command('populate_tutorial', *args, stdout=output, **options)
+        return output.getvalue()
+
+    def test_applied_bundle_is_skipped(self):
+        self.populate(bundle=self.path)
+        self.assertEqual(Lesson.objects.count(), 2)
+        self.assertEqual(ContentRelease.objects.count(), 1)
+        Lesson.objects.get(slug='models').delete()
+
+        with mock.patch('lessons.management.commands.populate_tutorial.sync_course') as sync:
+            self.assertIn('already applied', self.populate(bundle=self.path))
+        sync.assert_not_called()
+        self.populate(bundle=self.path, force=True)
+        self.assertEqual(Lesson.objects.count(), 2)
+
+    def test_changed_bundle_is_applied(self):
+        self.populate(bundle=self.path)
+        course = course_data()
+        course[0]['lessons'][0]['content'] = '# Introduction'
+        write_bundle(course, self.path)
+        self.assertIn('~ lesson basics/intro (content)', self.populate('--sync', bundle=self.path))
+        self.assertEqual(ContentRelease.objects.count(), 2)
+
+    def assertBundleError(self, message):
+        with self.assertRaisesMessage(CommandError, message):
+            self.populate(bundle=self.path)
+        self.assertFalse(Lesson.objects.exists())
+        self.assertFalse(ContentRelease.objects.exists())
+
+    def test_corrupt_payload(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(-2, os.SEEK_END)
+            f.write(b'!!')
+        self.assertBundleError('is corrupt')
+
+    def test_truncated_bundle(self):
+        os.truncate(self.path, os.path.getsize(self.path) - 10)
+        self.assertBundleError('is corrupt')
+        with open(self.path, 'r+b') as f:
+            f.truncate(len(f.readline()) // 2)
+        self.assertBundleError('is not a content bundle')
+        os.truncate(self.path, 0)
+        self.assertBundleError('Cannot open content bundle')
+
+    def test_stale_bundle_is_an_error(self):
+        os.utime(self.path, (0, 0))
+        with override_settings(CONTENT_BUNDLE_PATH=self.path):
+            with self.assertRaisesMessage(CommandError, 'older than lessons/content'):
+                self.populate()
+            self.assertFalse(Lesson.objects.exists())
+
+            load_course = 'lessons.management.commands.populate_tutorial.load_course'
+            with mock.patch(load_course, return_value=course_data()):
+                self.assertIn('Rebuilt', self.populate('--rebuild-bundle'))
+            self.assertFalse(source_changed_since(self.path))
+            self.assertEqual(Lesson.objects.count(), 2)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, async_views
 
 router = DefaultRouter()
 router.register(r'modules', views.ModuleViewSet)
@@ -12,8 +12,17 @@ app_name = 'lessons'
 urlpatterns = [
     path('', views.HomeView.as_view(), name='home'),
     path('api/', include(router.urls)),
+    # Native async catalog reads, for ASGI deployments
+    path('api/async/modules/', async_views.module_list, name='async-module-list'),
+    path('api/async/lessons/<int:pk>/', async_views.lesson_detail, name='async-lesson-detail'),
+    path('api/async/progress/summary/', async_views.progress_summary, name='async-progress-summary'),
     path('api/submit-exercise/', views.submit_exercise, name='submit-exercise'),
+    path('api/submit-exercise/stream/', views.submit_exercise_stream, name='submit-exercise-stream'),
+    path('api/submit-exercises/', views.submit_exercise_batch, name='submit-exercise-batch'),
+    path('api/exercise-results/<str:job_id>/', views.exercise_result, name='exercise-result'),
     path('api/submit-quiz/', views.submit_quiz, name='submit-quiz'),
+    path('api/submit-quizzes/', views.submit_quiz_batch, name='submit-quiz-batch'),
     path('api/export-progress/', views.get_progress_export, name='export-progress'),
+    path('api/export-progress/stream/', views.stream_progress_export, name='export-progress-stream'),
     path('api/import-progress/', views.import_progress, name='import-progress'),
 ]
@@ -1,53 +1,201 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.shortcuts import render
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.conf import settings
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from celery.result import AsyncResult
 import json
-import subprocess
-import tempfile
-import os
 
-from .models import Module, Lesson, UserProgress, Quiz, UserQuizAttempt
+from .cache import cached_catalog_response
+from .catalog import get_catalog
+from .models import Module, Lesson, UserProgress, UserQuizAttempt, QuizAttemptSummary
+from .progress import (
+    add_time_spent, get_progress_buffer, record_quiz_attempts, upsert_imported_progress
+)
+from .queries import progress_by_module, progress_summary
+from .exports import jsonl_lines
+from .exercises import run_exercise_tests, record_exercise_attempt, grade_many, stream_exercise_tests
+from .tasks import grade_exercise
 from .serializers import (
-    ModuleSerializer, LessonSerializer, UserProgressSerializer,
-    QuizSerializer, QuizAttemptSerializer, ExerciseSubmissionSerializer
+    ModuleSerializer, ModuleOutlineSerializer, LessonSerializer, UserProgressSerializer,
+    QuizSerializer, QuizAttemptSerializer, ExerciseSubmissionSerializer,
+    ExerciseBatchSerializer, HeartbeatSerializer, TrackTimeSerializer, ImportedProgressSerializer,
+    QuizBatchSerializer
 )
 
 
+def get_progress_map(user):
+    """Return the user's progress rows keyed by lesson id, in a single query"""
+    if not user or not user.is_authenticated:
+        return {}
+    return {
+        progress.lesson_id: progress
+        for progress in UserProgress.objects.filter(user=user)
+    }
+
+
+def query_flag(request, name, default):
+    """Read a boolean query parameter such as ?html=true (DRF or plain Django request)"""
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no')
+
+
+def include_progress(request):
+    """False when the client asked for content only (?include_progress=false)"""
+    return query_flag(request, 'include_progress', True)
+
+
+def include_html(request):
+    """True when the client asked for pre-rendered lesson HTML (?html=true)"""
+    return query_flag(request, 'html', False)
+
+
 class HomeView(TemplateView):
     """Main tutorial interface"""
     template_name = 'lessons/home.html'
 
 
-class ModuleViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint for modules"""
+class CatalogCacheMixin:
+    """
+    Serves list/retrieve from the shared catalog cache whenever the response
+    carries no per-user data (anonymous or ?include_progress=false requests).
+    """
+    cache_prefix = None
+    
+    def is_per_user(self, request):
+        return request.user.is_authenticated and include_progress(request)
+    
+    def get_cache_variant(self, request):
+        variant = []
+        if not include_progress(request):
+            variant.append('content')
+        if include_html(request):
+            variant.append('html')
+        return ':'.join(variant)
+    
+    def use_shared_cache(self, request):
+        return (
+            not self.is_per_user(request)
+            and request.accepted_renderer.format == 'json'
+        )
+    
+    def get_cache_name(self, request, *parts):
+        variant = self.get_cache_variant(request)
+        return ':'.join([self.cache_prefix, *parts, *([variant] if variant else [])])
+    
+    def list(self, request, *args, **kwargs):
+        if not self.use_shared_cache(request):
+            return super().list(request, *args, **kwargs)
+        return cached_catalog_response(
+            request, self.get_cache_name(request),
+            lambda: JSONRenderer().render(super(CatalogCacheMixin, self).list(request, *args, **kwargs).data)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_shared_cache(request):
+            return super().retrieve(request, *args, **kwargs)
+        lookup = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return cached_catalog_response(
+            request, self.get_cache_name(request, lookup),
+            lambda: JSONRenderer().render(super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs).data)
+        )
+
+
+class ModuleViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for modules
+    
+    ?view=outline returns only ids, titles, slugs, order and counts for each
+    lesson; bodies are then loaded from the lesson detail endpoint.
+    """
     queryset = Module.objects.all()
     serializer_class = ModuleSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    cache_prefix = 'modules'
+    
+    def is_outline(self):
+        return self.request.query_params.get('view') == 'outline'
+    
+    def get_queryset(self):
+        """The catalog comes from the in-process snapshot, so serializing it runs no queries"""
+        return get_catalog().modules
+    
+    def get_object(self):
+        module = get_catalog().modules_by_slug.get(self.kwargs[self.lookup_field])
+        if module is None:
+            raise Http404('No Module matches the given query.')
+        self.check_object_permissions(self.request, module)
+        return module
+    
+    def get_serializer_class(self):
+        if self.is_outline():
+            return ModuleOutlineSerializer
+        return super().get_serializer_class()
     
     def get_serializer_context(self):
-        """Pass request context to the serializer"""
+        """Pass request context and the user's progress rows to the serializer"""
         context = super().get_serializer_context()
         context['request'] = self.request
+        context['include_progress'] = include_progress(self.request)
+        context['include_html'] = include_html(self.request)
+        if context['include_progress'] and not self.is_outline():
+            context['progress_map'] = get_progress_map(self.request.user)
         return context
+    
+    def is_per_user(self, request):
+        # The outline never carries per-user fields
+        return not self.is_outline() and super().is_per_user(request)
+    
+    def get_cache_variant(self, request):
+        if self.is_outline():
+            return 'outline'
+        return super().get_cache_variant(request)
 
 
-class LessonViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint for lessons"""
+class LessonViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for lessons
+    
+    ?html=true adds content_html, django_code_html and dotnet_code_html,
+    rendered server-side when the lesson was saved.
+    """
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [AllowAny]
+    cache_prefix = 'lessons'
+    
+    def get_queryset(self):
+        return get_catalog().lessons
+    
+    def get_object(self):
+        try:
+            lesson = get_catalog().lessons_by_id.get(int(self.kwargs['pk']))
+        except ValueError:
+            lesson = None
+        if lesson is None:
+            raise Http404('No Lesson matches the given query.')
+        self.check_object_permissions(self.request, lesson)
+        return lesson
     
     def get_serializer_context(self):
-        """Pass request context to the serializer"""
+        """Pass request context and the user's progress rows to the serializer"""
         context = super().get_serializer_context()
         context['request'] = self.request
+        context['include_progress'] = include_progress(self.request)
+        context['include_html'] = include_html(self.request)
+        if self.action in ('list', 'retrieve') and context['include_progress']:
+            context['progress_map'] = get_progress_map(self.request.user)
         return context
     
     @action(detail=True, methods=['post'], permission_classes=[AllowAny])
@@ -55,27 +203,33 @@ class LessonViewSet(viewsets.ReadOnlyModelViewSet):
         """Mark a lesson as complete"""
         lesson = self.get_object()
         if request.user.is_authenticated:
+            # Saving the row refreshes the module rollup (see models.refresh_progress_rollup)
             progress, created = UserProgress.objects.get_or_create(
                 user=request.user,
-                lesson=lesson
+                lesson_id=lesson.id,
+                defaults={'completed': True, 'completed_at': timezone.now()}
             )
-            progress.mark_complete()
+            if not created:
+                progress.mark_complete()
         return Response({'status': 'completed'})
     
     @action(detail=True, methods=['post'], permission_classes=[AllowAny])
     def track_time(self, request, pk=None):
         """Track time spent on a lesson"""
         lesson = self.get_object()
-        time_spent = request.data.get('time_spent_seconds', 0)
+        serializer = TrackTimeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        time_spent = serializer.validated_data['time_spent_seconds']
         
         if request.user.is_authenticated:
-            progress, created = UserProgress.objects.get_or_create(
-                user=request.user,
-                lesson=lesson
-            )
-            progress.time_spent_seconds += time_spent
-            progress.save()
-            return Response({'total_time': progress.time_spent_seconds})
+            add_time_spent(request.user, {lesson.id: time_spent})
+            # Stored time plus whatever this process hasn't flushed yet
+            stored_time = UserProgress.objects.filter(
+                user=request.user, lesson_id=lesson.id
+            ).values_list('time_spent_seconds', flat=True).first()
+            pending_time = get_progress_buffer().pending_time(request.user.id, lesson.id)
+            return Response({'total_time': (stored_time or 0) + pending_time})
         else:
             return Response({'total_time': time_spent})
 
@@ -88,35 +242,91 @@ class UserProgressViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return UserProgress.objects.filter(user=self.request.user)
     
-    @action(detail=False, methods=['get'])
-    def summary(self, request):
-        """Get overall progress summary"""
-        progress = self.get_queryset()
-        total_lessons = Lesson.objects.count()
-        completed_lessons = progress.filter(completed=True).count()
-        total_time = sum(p.time_spent_seconds for p in progress)
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def overlay(self, request):
+        """Per-user progress keyed by lesson id, to merge over content-only catalog data"""
+        if not request.user.is_authenticated:
+            return Response({})
+        
+        rows = UserProgress.objects.filter(user=request.user).values(
+            'lesson_id', 'completed', 'exercise_completed',
+            'time_spent_seconds', 'last_accessed'
+        )
+        return Response({
+            str(row.pop('lesson_id')): row
+            for row in rows
+        })
+    
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    def heartbeat(self, request):
+        """
+        Record time spent on several lessons in one request
         
-        modules_progress = []
-        for module in Module.objects.all():
-            module_data = ModuleSerializer(module, context={'request': request}).data
-            modules_progress.append({
-                'id': module.id,
-                'title': module.title,
-                'progress_percentage': module_data['progress_percentage']
-            })
+        Takes {"deltas": {"<lesson_id>": seconds, ...}} with the seconds spent
+        since the client's previous heartbeat. Anonymous heartbeats are
+        accepted and ignored; those clients keep time in localStorage.
+        """
+        serializer = HeartbeatSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+        recorded = 0
+        if request.user.is_authenticated:
+            recorded = add_time_spent(request.user, serializer.validated_data['deltas'])
+        return Response({'recorded': recorded})
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def quizzes(self, request):
+        """
+        The user's latest answer to each quiz they've attempted, keyed by quiz id
+        
+        Pass ?lesson=<id> to limit it to one lesson's quizzes.
+        """
+        if not request.user.is_authenticated:
+            return Response({})
+        
+        summaries = QuizAttemptSummary.objects.filter(user=request.user)
+        lesson_id = request.query_params.get('lesson')
+        if lesson_id is not None:
+            try:
+                lesson = get_catalog().lessons_by_id.get(int(lesson_id))
+            except ValueError:
+                lesson = None
+            if lesson is None:
+                return Response({'error': 'Lesson not found'}, status=status.HTTP_404_NOT_FOUND)
+            summaries = summaries.filter(quiz_id__in=[quiz.id for quiz in lesson.quizzes])
+        
+        rows = summaries.values(
+            'quiz_id', 'attempts', 'last_answer', 'last_is_correct',
+            'last_attempted_at', 'first_correct_at'
+        )
         return Response({
-            'total_lessons': total_lessons,
-            'completed_lessons': completed_lessons,
-            'progress_percentage': int((completed_lessons / total_lessons * 100) if total_lessons > 0 else 0),
-            'total_time_seconds': total_time,
-            'modules_progress': modules_progress
+            str(row.pop('quiz_id')): row
+            for row in rows
         })
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Get overall progress summary"""
+        return Response(progress_summary(progress_by_module(request.user)))
+
+
+def remember_job(request, job_id):
+    """Record an async grading job as issued to this session"""
+    history = getattr(settings, 'EXERCISE_JOB_HISTORY_SIZE', 50)
+    jobs = request.session.get('exercise_jobs', [])
+    request.session['exercise_jobs'] = (jobs + [job_id])[-history:]
 
 
 @api_view(['POST'])
 def submit_exercise(request):
-    """Submit and test exercise code"""
+    """
+    Submit and test exercise code
+    
+    With ?async=true the submission is queued for a Celery worker and the
+    response carries a job_id to poll at /api/exercise-results/<job_id>/.
+    Only the session that submitted a job can poll it.
+    """
     serializer = ExerciseSubmissionSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -124,101 +334,134 @@ def submit_exercise(request):
     lesson_id = serializer.validated_data['lesson_id']
     code = serializer.validated_data['code']
     
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    if query_flag(request, 'async', False):
+        user_id = request.user.id if request.user.is_authenticated else None
+        job = grade_exercise.delay(lesson_id, code, user_id)
+        remember_job(request, job.id)
+        return Response(
+            {'job_id': job.id, 'status': 'pending'},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    lesson = get_catalog().lessons_by_id.get(lesson_id)
+    if lesson is None:
+        raise Http404('No Lesson matches the given query.')
     
     # Run tests on the submitted code
-    test_results = run_exercise_tests(code, lesson.exercise_tests)
+    test_results = run_exercise_tests(code, lesson.exercise_tests, models=lesson.exercise_models)
     
     # Update progress if authenticated
     if request.user.is_authenticated:
-        progress, created = UserProgress.objects.get_or_create(
-            user=request.user,
-            lesson=lesson
-        )
-        progress.exercise_attempts += 1
-        progress.exercise_code = code
-        
-        if test_results['all_passed']:
-            progress.exercise_completed = True
-        
-        progress.save()
+        record_exercise_attempt(request.user, lesson, code, test_results)
     
     return Response(test_results)
 
 
-def run_exercise_tests(code, tests_json):
-    """Run tests on submitted code"""
-    if not tests_json:
-        return {'all_passed': True, 'results': [], 'message': 'No tests defined'}
+@api_view(['POST'])
+def submit_exercise_stream(request):
+    """
+    Submit exercise code and stream the results as Server-Sent Events
     
-    try:
-        tests = json.loads(tests_json)
-    except json.JSONDecodeError:
-        return {'all_passed': False, 'error': 'Invalid test configuration'}
+    Sends a `test` event for each test as soon as it finishes, then a
+    `summary` event with the same body submit_exercise returns. The attempt
+    is recorded even if the client disconnects before the summary.
+    """
+    serializer = ExerciseSubmissionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    results = []
-    all_passed = True
+    lesson = get_catalog().lessons_by_id.get(serializer.validated_data['lesson_id'])
+    if lesson is None:
+        raise Http404('No Lesson matches the given query.')
+    code = serializer.validated_data['code']
+    user = request.user
+    events = stream_exercise_tests(code, lesson.exercise_tests, models=lesson.exercise_models)
     
-    # Create a temporary file to run the code
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-        f.write(code)
-        f.write('\n\n# Test execution\n')
-        
-        for i, test in enumerate(tests):
-            test_code = test.get('code', '')
-            expected = test.get('expected', '')
-            f.write(f'\n# Test {i+1}\n')
-            f.write(test_code)
-        
-        temp_file = f.name
+    def record(event, data):
+        if event == 'summary' and user.is_authenticated:
+            record_exercise_attempt(user, lesson, code, data)
+    
+    def stream():
+        try:
+            for event, data in events:
+                record(event, data)
+                yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        finally:
+            # Closed early (client gone): finish grading so the attempt still counts
+            for event, data in events:
+                record(event, data)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def submit_exercise_batch(request):
+    """
+    Grade many submissions at once (staff only)
+    
+    Takes {"submissions": [{"lesson_id": 1, "code": "..."}, ...]} and streams
+    one JSON line per submission as soon as it is graded, in completion order.
+    Each line carries the submission's index in the request. Attempts are not
+    recorded against anyone's progress.
+    """
+    serializer = ExerciseBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    submissions = [
+        (item['lesson'], item['code'])
+        for item in serializer.validated_data['submissions']
+    ]
+    
+    def stream():
+        for index, lesson, test_results in grade_many(submissions):
+            yield json.dumps({
+                'index': index,
+                'lesson_id': lesson.id,
+                **test_results
+            }) + '\n'
+    
+    return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+
+
+@api_view(['GET'])
+def exercise_result(request, job_id):
+    """
+    Poll an async exercise grading job
+    
+    ?wait=<seconds> long-polls for up to EXERCISE_RESULT_MAX_WAIT seconds.
+    Celery reports unknown ids as pending, so ids this session never
+    submitted are answered with a 404 instead.
+    """
+    if job_id not in request.session.get('exercise_jobs', []):
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    job = AsyncResult(job_id)
     
     try:
-        # Run the code
-        result = subprocess.run(
-            ['python', temp_file],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode != 0:
-            all_passed = False
-            results.append({
-                'passed': False,
-                'error': result.stderr
-            })
-        else:
-            # Parse output and compare with expected results
-            output_lines = result.stdout.strip().split('\n')
-            for i, test in enumerate(tests):
-                expected = str(test.get('expected', ''))
-                actual = output_lines[i] if i < len(output_lines) else ''
-                passed = actual == expected
-                if not passed:
-                    all_passed = False
-                results.append({
-                    'test': test.get('description', f'Test {i+1}'),
-                    'passed': passed,
-                    'expected': expected,
-                    'actual': actual
-                })
-    
-    except subprocess.TimeoutExpired:
-        all_passed = False
-        results = [{'passed': False, 'error': 'Code execution timed out'}]
-    
-    except Exception as e:
-        all_passed = False
-        results = [{'passed': False, 'error': str(e)}]
-    
-    finally:
-        # Clean up
-        os.unlink(temp_file)
+        wait = min(float(request.query_params.get('wait', 0)), settings.EXERCISE_RESULT_MAX_WAIT)
+    except ValueError:
+        wait = 0
+    if wait > 0 and not job.ready():
+        try:
+            job.get(timeout=wait, propagate=False)
+        except CeleryTimeoutError:
+            pass
     
-    return {
-        'all_passed': all_passed,
-        'results': results
-    }
+    if not job.ready():
+        return Response({'job_id': job_id, 'status': 'pending'})
+    if job.failed():
+        return Response({
+            'job_id': job_id,
+            'status': 'failed',
+            'error': 'Grading failed, please try again'
+        })
+    return Response({'job_id': job_id, 'status': 'done', 'result': job.result})
 
 
 @api_view(['POST'])
@@ -228,20 +471,22 @@ def submit_quiz(request):
     selected_answer = request.data.get('selected_answer')
     
     try:
-        quiz = Quiz.objects.get(id=quiz_id)
-    except Quiz.DoesNotExist:
+        quiz = get_catalog().quizzes_by_id.get(int(quiz_id))
+    except (TypeError, ValueError):
+        quiz = None
+    if quiz is None:
         return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
     
     is_correct = selected_answer == quiz.correct_answer
     
     # Save attempt if user is authenticated
     if request.user.is_authenticated:
-        UserQuizAttempt.objects.create(
+        record_quiz_attempts([UserQuizAttempt(
             user=request.user,
-            quiz=quiz,
+            quiz_id=quiz.id,
             selected_answer=selected_answer,
             is_correct=is_correct
-        )
+        )])
     
     response_data = {
         'is_correct': is_correct,
@@ -252,6 +497,46 @@ def submit_quiz(request):
     return Response(response_data)
 
 
+@api_view(['POST'])
+def submit_quiz_batch(request):
+    """
+    Grade all of a lesson's quiz answers in one request
+    
+    Takes {"lesson_id": 1, "answers": [{"quiz": 1, "selected_answer": 2}, ...]}.
+    Answers are checked against the in-process catalog, and an authenticated
+    user's attempts are saved with a single insert (see record_quiz_attempts).
+    """
+    serializer = QuizBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = []
+    attempts = []
+    for quiz, selected_answer in serializer.validated_data['answers']:
+        is_correct = selected_answer == quiz.correct_answer
+        results.append({
+            'quiz': quiz.id,
+            'selected_answer': selected_answer,
+            'is_correct': is_correct,
+            'correct_answer': quiz.correct_answer,
+            'explanation': quiz.explanation
+        })
+        if request.user.is_authenticated:
+            attempts.append(UserQuizAttempt(
+                user=request.user,
+                quiz_id=quiz.id,
+                selected_answer=selected_answer,
+                is_correct=is_correct
+            ))
+    record_quiz_attempts(attempts)
+    
+    return Response({
+        'results': results,
+        'correct': sum(result['is_correct'] for result in results),
+        'total': len(results)
+    })
+
+
 @api_view(['GET'])
 def get_progress_export(request):
     """Export user progress data for localStorage"""
@@ -264,7 +549,7 @@ def get_progress_export(request):
         })
     
     progress_data = UserProgressSerializer(
-        UserProgress.objects.filter(user=request.user),
+        UserProgress.objects.filter(user=request.user).select_related('lesson__module'),
         many=True
     ).data
     
@@ -279,6 +564,20 @@ def get_progress_export(request):
     })
 
 
+@api_view(['GET'])
+def stream_progress_export(request):
+    """
+    Export user progress as JSON Lines, streamed
+    
+    Same data as /api/export-progress/, one record per line: a "user" line,
+    then a "progress" line per lesson and a "quiz_attempt" line per attempt.
+    Memory use and time to first byte don't depend on the size of the history.
+    """
+    response = StreamingHttpResponse(jsonl_lines(request.user), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="progress.jsonl"'
+    return response
+
+
 @api_view(['POST'])
 def import_progress(request):
     """Import progress data from localStorage"""
@@ -288,27 +587,38 @@ def import_progress(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    data = request.data
-    progress_data = data.get('progress', {})
+    progress_data = request.data.get('progress', {})
+    if not isinstance(progress_data, dict):
+        return Response(
+            {'error': 'progress must be an object keyed by lesson id'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    imported_count = 0
-    for lesson_id, progress_info in progress_data.items():
+    # Validate every entry up front; invalid ones are reported, not imported
+    entries = {}
+    results = {}
+    errors = {}
+    for key, progress_info in progress_data.items():
+        serializer = ImportedProgressSerializer(data=progress_info)
         try:
-            lesson = Lesson.objects.get(id=int(lesson_id))
-            progress, created = UserProgress.objects.update_or_create(
-                user=request.user,
-                lesson=lesson,
-                defaults={
-                    'completed': progress_info.get('completed', False),
-                    'exercise_completed': progress_info.get('exercise_completed', False),
-                    'time_spent_seconds': progress_info.get('time_spent_seconds', 0),
-                }
-            )
-            imported_count += 1
-        except (Lesson.DoesNotExist, ValueError):
+            lesson_id = int(key)
+        except (TypeError, ValueError):
+            results[key] = 'invalid'
+            errors[key] = ['Keys must be lesson ids.']
+            continue
+        if not serializer.is_valid():
+            results[key] = 'invalid'
+            errors[key] = serializer.errors
             continue
+        entries[lesson_id] = serializer.validated_data
+    
+    for lesson_id, outcome in upsert_imported_progress(request.user, entries).items():
+        results[str(lesson_id)] = outcome
     
+    imported_count = sum(outcome in ('created', 'updated') for outcome in results.values())
     return Response({
         'imported': imported_count,
-        'message': f'Successfully imported progress for {imported_count} lessons'
+        'message': f'Successfully imported progress for {imported_count} lessons',
+        'results': results,
+        'errors': errors
     })
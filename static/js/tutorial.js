@@ -7,6 +7,7 @@ class TutorialApp {
         this.progress = {};
         this.timeTracker = null;
         this.startTime = null;
+        this.pendingTime = {};  // lesson id -> seconds not yet sent to the server
         
         this.init();
     }
@@ -44,8 +45,14 @@ class TutorialApp {
     
     async loadModules() {
         try {
-            const response = await fetch('/api/modules/');
-            this.modules = await response.json();
+            // Only the outline is needed to render navigation; lesson bodies are
+            // fetched on demand. The per-user progress overlay is merged in separately.
+            const [modulesResponse, overlay] = await Promise.all([
+                fetch('/api/modules/?view=outline'),
+                this.loadProgressOverlay()
+            ]);
+            this.modules = await modulesResponse.json();
+            this.applyProgressOverlay(overlay);
             this.renderModulesList();
             this.renderModulesGrid();
             this.updateOverallProgress();
@@ -54,6 +61,31 @@ class TutorialApp {
         }
     }
     
+    async loadProgressOverlay() {
+        try {
+            const response = await fetch('/api/progress/overlay/');
+            return response.ok ? await response.json() : {};
+        } catch (error) {
+            console.log('Progress overlay unavailable, using local storage only:', error.message);
+            return {};
+        }
+    }
+    
+    applyProgressOverlay(overlay) {
+        this.modules.forEach(module => {
+            let completedLessons = 0;
+            module.lessons.forEach(lesson => {
+                const progress = overlay[lesson.id] || null;
+                lesson.progress = progress;
+                lesson.is_completed = Boolean(progress && progress.completed);
+                if (lesson.is_completed) {
+                    completedLessons++;
+                }
+            });
+            module.completed_lessons = completedLessons;
+        });
+    }
+    
     renderModulesList() {
         const container = document.getElementById('modules-list');
         container.innerHTML = '';
@@ -159,6 +191,17 @@ class TutorialApp {
         }
     }
     
+    async fetchLessonBody(lesson) {
+        if (lesson.content !== undefined) return lesson;
+        
+        const response = await fetch(`/api/lessons/${lesson.id}/?include_progress=false&html=true`);
+        if (!response.ok) {
+            throw new Error(`Failed to load lesson ${lesson.id}: ${response.status}`);
+        }
+        Object.assign(lesson, await response.json());
+        return lesson;
+    }
+    
     async loadLesson(module, lesson) {
         // Stop time tracking for previous lesson
         this.stopTimeTracking();
@@ -166,6 +209,17 @@ class TutorialApp {
         this.currentModule = module;
         this.currentLesson = lesson;
         
+        // Lesson bodies are not part of the module outline
+        try {
+            await this.fetchLessonBody(lesson);
+        } catch (error) {
+            console.error('Error loading lesson:', error);
+            return;
+        }
+        
+        // Another lesson was selected while this one was loading
+        if (this.currentLesson !== lesson) return;
+        
         // Update URL
         this.updateURL('lesson', { moduleSlug: module.slug, lessonSlug: lesson.slug });
         
@@ -184,18 +238,19 @@ class TutorialApp {
         document.getElementById('lesson-breadcrumb').textContent = lesson.title;
         document.getElementById('lesson-title').textContent = lesson.title;
         
-        // Render lesson content
-        document.getElementById('lesson-body').innerHTML = marked.parse(lesson.content);
-        
-        // Syntax highlighting
-        Prism.highlightAll();
+        // Render lesson content (pre-rendered and highlighted server-side when available)
+        if (lesson.content_html) {
+            document.getElementById('lesson-body').innerHTML = lesson.content_html;
+        } else {
+            document.getElementById('lesson-body').innerHTML = marked.parse(lesson.content);
+            Prism.highlightAll();
+        }
         
         // Show code comparison if available
         if (lesson.django_code || lesson.dotnet_code) {
             document.getElementById('code-comparison').style.display = 'block';
-            document.getElementById('django-code').textContent = lesson.django_code || '';
-            document.getElementById('dotnet-code').textContent = lesson.dotnet_code || '';
-            Prism.highlightAll();
+            this.renderCodeSample('django-code', lesson.django_code, lesson.django_code_html);
+            this.renderCodeSample('dotnet-code', lesson.dotnet_code, lesson.dotnet_code_html);
         } else {
             document.getElementById('code-comparison').style.display = 'none';
         }
@@ -244,6 +299,18 @@ class TutorialApp {
         this.updateLessonProgress();
     }
     
+    renderCodeSample(elementId, code, html) {
+        const codeEl = document.getElementById(elementId);
+        if (html) {
+            codeEl.innerHTML = html;
+            codeEl.classList.add('highlighted');
+        } else {
+            codeEl.textContent = code || '';
+            codeEl.classList.remove('highlighted');
+            Prism.highlightElement(codeEl);
+        }
+    }
+    
     renderQuizzes(quizzes) {
         const container = document.getElementById('quiz-container');
         container.innerHTML = '';
@@ -266,6 +333,15 @@ class TutorialApp {
             container.appendChild(quizEl);
         });
         
+        // Answers are checked together, in one request per lesson
+        this.quizAnswers = {};
+        const checkButton = document.createElement('button');
+        checkButton.className = 'btn btn-primary';
+        checkButton.id = 'check-quiz';
+        checkButton.innerHTML = '<i class="fas fa-check"></i> Check Answers';
+        checkButton.onclick = () => this.submitQuizAnswers();
+        container.appendChild(checkButton);
+        
         // Add click handlers
         document.querySelectorAll('.quiz-option').forEach(el => {
             el.onclick = (e) => {
@@ -313,7 +389,7 @@ class TutorialApp {
         });
     }
     
-    async selectQuizAnswer(quizId, answer) {
+    selectQuizAnswer(quizId, answer) {
         const option = document.querySelector(`[data-quiz="${quizId}"][data-answer="${answer}"]`);
         
         if (!option) {
@@ -326,61 +402,89 @@ class TutorialApp {
             el.classList.remove('selected', 'correct', 'incorrect');
         });
         option.classList.add('selected');
+        document.getElementById(`quiz-result-${quizId}`).innerHTML = '';
         
-        // Submit answer to server
+        this.quizAnswers[quizId] = answer;
+    }
+    
+    async submitQuizAnswers() {
+        const answers = Object.entries(this.quizAnswers).map(([quizId, answer]) => ({
+            quiz: parseInt(quizId),
+            selected_answer: answer
+        }));
+        if (answers.length === 0) {
+            this.showNotification('Select an answer first', 'info');
+            return;
+        }
+        
+        // Submit every selected answer to the server at once
         try {
-            const response = await fetch('/api/submit-quiz/', {
+            const response = await fetch('/api/submit-quizzes/', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': this.getCookie('csrftoken')
                 },
                 body: JSON.stringify({
-                    quiz: quizId,
-                    selected_answer: answer
+                    lesson_id: this.currentLesson.id,
+                    answers: answers
                 })
             });
-            
-            const result = await response.json();
-            const resultEl = document.getElementById(`quiz-result-${quizId}`);
-            
-            // Show result
-            if (result.is_correct) {
-                option.classList.add('correct');
-                option.classList.add('selected'); // Keep selected state
-                resultEl.innerHTML = `<div class="alert alert-success">Correct! ${result.explanation}</div>`;
-            } else {
-                option.classList.add('incorrect');
-                option.classList.add('selected'); // Keep selected state
-                const correctOption = option.parentElement.children[result.correct_answer];
-                if (correctOption) {
-                    correctOption.classList.add('correct');
-                }
-                resultEl.innerHTML = `<div class="alert alert-danger">Incorrect. ${result.explanation}</div>`;
+            if (!response.ok) {
+                throw new Error(`Server returned ${response.status}`);
             }
             
-            // Store result locally for progress tracking
-            const quizResults = JSON.parse(localStorage.getItem('quizResults') || '{}');
-            quizResults[quizId] = { selected_answer: answer, is_correct: result.is_correct };
-            localStorage.setItem('quizResults', JSON.stringify(quizResults));
+            const data = await response.json();
             
-            // Disable further selection
-            option.parentElement.querySelectorAll('.quiz-option').forEach(el => {
-                el.style.pointerEvents = 'none';
+            // Store results locally for progress tracking
+            const quizResults = JSON.parse(localStorage.getItem('quizResults') || '{}');
+            data.results.forEach(result => {
+                this.showQuizResult(result);
+                quizResults[result.quiz] = { selected_answer: result.selected_answer, is_correct: result.is_correct };
+                delete this.quizAnswers[result.quiz];
             });
+            localStorage.setItem('quizResults', JSON.stringify(quizResults));
         } catch (error) {
             console.error('Error submitting quiz:', error);
         }
     }
     
+    showQuizResult(result) {
+        const option = document.querySelector(`[data-quiz="${result.quiz}"][data-answer="${result.selected_answer}"]`);
+        const resultEl = document.getElementById(`quiz-result-${result.quiz}`);
+        if (!option || !resultEl) return;
+        
+        // Show result
+        if (result.is_correct) {
+            option.classList.add('correct');
+            option.classList.add('selected'); // Keep selected state
+            resultEl.innerHTML = `<div class="alert alert-success">Correct! ${result.explanation}</div>`;
+        } else {
+            option.classList.add('incorrect');
+            option.classList.add('selected'); // Keep selected state
+            const correctOption = option.parentElement.children[result.correct_answer];
+            if (correctOption) {
+                correctOption.classList.add('correct');
+            }
+            resultEl.innerHTML = `<div class="alert alert-danger">Incorrect. ${result.explanation}</div>`;
+        }
+        
+        // Disable further selection
+        option.parentElement.querySelectorAll('.quiz-option').forEach(el => {
+            el.style.pointerEvents = 'none';
+        });
+    }
+    
     async runExercise() {
         const code = document.getElementById('exercise-code').value;
         const resultsEl = document.getElementById('test-results');
         
-        resultsEl.innerHTML = '<div class="alert alert-info">Running tests...</div>';
+        resultsEl.innerHTML = '<div class="alert alert-info">Running tests...</div><div class="test-results-stream"></div>';
+        const streamEl = resultsEl.querySelector('.test-results-stream');
         
         try {
-            const response = await fetch('/api/submit-exercise/', {
+            // Results arrive as Server-Sent Events: one per test, then a summary
+            const response = await fetch('/api/submit-exercise/stream/', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -392,28 +496,77 @@ class TutorialApp {
                 })
             });
             
-            const result = await response.json();
-            
-            if (result.all_passed) {
-                resultsEl.innerHTML = '<div class="alert alert-success">All tests passed! Great job!</div>';
-                // Mark exercise as completed in local progress
-                this.updateLocalProgress('exercise_completed', true);
-            } else {
-                let html = '<div class="alert alert-danger">Some tests failed:</div>';
-                result.results.forEach(test => {
-                    html += `<div class="test-result ${test.passed ? 'passed' : 'failed'}">
-                        ${test.test || 'Test'}: ${test.passed ? 'Passed' : 'Failed'}
-                        ${test.error ? `<br>Error: ${test.error}` : ''}
-                        ${!test.passed && test.expected ? `<br>Expected: ${test.expected}<br>Got: ${test.actual}` : ''}
-                    </div>`;
-                });
-                resultsEl.innerHTML = html;
+            if (!response.ok) {
+                const errors = await response.json().catch(() => ({}));
+                throw new Error(Object.values(errors).flat().join(' ') || response.statusText);
             }
+            
+            await this.readEventStream(response, (event, data) => {
+                if (event === 'test') {
+                    streamEl.insertAdjacentHTML('beforeend', this.renderTestResult(data));
+                } else if (event === 'summary') {
+                    this.showExerciseResults(data);
+                }
+            });
         } catch (error) {
             resultsEl.innerHTML = '<div class="alert alert-danger">Error running tests: ' + error.message + '</div>';
         }
     }
     
+    async readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+    
+    renderTestResult(test) {
+        return `<div class="test-result ${test.passed ? 'passed' : 'failed'}">
+            ${test.test || 'Test'}: ${test.passed ? 'Passed' : 'Failed'}
+            ${test.error ? `<br>Error: ${test.error}` : ''}
+            ${!test.passed && test.expected ? `<br>Expected: ${test.expected}<br>Got: ${test.actual}` : ''}
+        </div>`;
+    }
+    
+    showExerciseResults(result) {
+        const resultsEl = document.getElementById('test-results');
+        
+        if (result.all_passed) {
+            resultsEl.innerHTML = '<div class="alert alert-success">All tests passed! Great job!</div>';
+            // Mark exercise as completed in local progress
+            this.updateLocalProgress('exercise_completed', true);
+        } else {
+            let html = '<div class="alert alert-danger">Some tests failed:</div>';
+            (result.results || []).forEach(test => {
+                html += this.renderTestResult(test);
+            });
+            if (result.error) {
+                html += `<div class="test-result failed">${result.error}</div>`;
+            }
+            resultsEl.innerHTML = html;
+        }
+    }
+    
     getSavedExerciseCode(lessonId) {
         const exerciseCodes = JSON.parse(localStorage.getItem('exerciseCodes') || '{}');
         return exerciseCodes[lessonId];
@@ -816,59 +969,74 @@ class TutorialApp {
     
     startTimeTracking() {
         this.startTime = Date.now();
-        this.timeTracker = setInterval(() => {
-            const elapsed = Math.floor((Date.now() - this.startTime) / 1000);
-            if (elapsed > 0 && elapsed % 30 === 0) {
-                // Save time every 30 seconds
-                this.saveTimeSpent(elapsed);
-            }
-        }, 1000);
+        // Send the time collected so far every 30 seconds
+        this.timeTracker = setInterval(() => this.sendHeartbeat(), 30000);
     }
     
     stopTimeTracking() {
         if (this.timeTracker) {
             clearInterval(this.timeTracker);
-            if (this.startTime) {
-                const elapsed = Math.floor((Date.now() - this.startTime) / 1000);
-                this.saveTimeSpent(elapsed);
-            }
+            // keepalive lets the request outlive a closing tab
+            this.sendHeartbeat(true);
             this.timeTracker = null;
             this.startTime = null;
         }
     }
     
-    async saveTimeSpent(seconds) {
-        if (!this.currentLesson) return;
+    recordTimeSpent() {
+        if (!this.currentLesson || !this.startTime) return;
+        
+        const seconds = Math.floor((Date.now() - this.startTime) / 1000);
+        if (seconds <= 0) return;
+        this.startTime += seconds * 1000;
         
         // Save to local storage
-        if (!this.progress[this.currentLesson.id]) {
-            this.progress[this.currentLesson.id] = {};
+        const lessonId = this.currentLesson.id;
+        if (!this.progress[lessonId]) {
+            this.progress[lessonId] = {};
         }
-        this.progress[this.currentLesson.id].time_spent_seconds = 
-            (this.progress[this.currentLesson.id].time_spent_seconds || 0) + seconds;
+        this.progress[lessonId].time_spent_seconds = 
+            (this.progress[lessonId].time_spent_seconds || 0) + seconds;
         this.saveProgress();
         
-        // Try to save to server (gracefully handle auth errors)
+        // Queue the delta for the next heartbeat
+        this.pendingTime[lessonId] = (this.pendingTime[lessonId] || 0) + seconds;
+    }
+    
+    async sendHeartbeat(keepalive = false) {
+        this.recordTimeSpent();
+        const deltas = this.pendingTime;
+        if (Object.keys(deltas).length === 0) return;
+        this.pendingTime = {};
+        
+        // One request carries the time for every lesson since the last heartbeat
         try {
-            const response = await fetch(`/api/lessons/${this.currentLesson.id}/track_time/`, {
+            const response = await fetch('/api/progress/heartbeat/', {
                 method: 'POST',
+                keepalive: keepalive,
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': this.getCookie('csrftoken')
                 },
-                body: JSON.stringify({
-                    time_spent_seconds: seconds
-                })
+                body: JSON.stringify({ deltas: deltas })
             });
             
-            if (!response.ok && response.status === 403) {
-                console.log('Time tracking requires authentication, using local storage only');
+            if (response.status >= 500) {
+                this.requeueTime(deltas);
             }
         } catch (error) {
-            console.log('Server time tracking failed, using local storage only:', error.message);
+            // Offline or aborted: send it with the next heartbeat
+            this.requeueTime(deltas);
+            console.log('Server time tracking failed, will retry:', error.message);
         }
     }
     
+    requeueTime(deltas) {
+        Object.entries(deltas).forEach(([lessonId, seconds]) => {
+            this.pendingTime[lessonId] = (this.pendingTime[lessonId] || 0) + seconds;
+        });
+    }
+    
     showProgressDashboard() {
         document.getElementById('welcome-screen').style.display = 'none';
         document.getElementById('lesson-content').style.display = 'none';
@@ -0,0 +1,29 @@
+"""
+Celery application for the tutorial project.
+
+Start a worker with ``celery -A tutorial worker -l info``. Configuration is
+read from the CELERY_* names in settings.py.
+"""
+import os
+
+from celery import Celery
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tutorial.settings')
+
+app = Celery('tutorial')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@receiver(setting_changed)
+def apply_celery_setting(setting, value, **kwargs):
+    """Let override_settings(CELERY_...) reach the already-configured app"""
+    if not setting.startswith('CELERY_'):
+        return
+    app.conf[setting[len('CELERY_'):].lower()] = value
+    if setting == 'CELERY_RESULT_BACKEND':
+        # Drop the cached backend so the next result lookup builds the new one
+        app._backend_cache = None
+        app._local.backend = None
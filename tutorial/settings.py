@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -148,9 +149,76 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cache
+# The catalog version lives in the database, so a per-process cache is always
+# correct; point REDIS_CACHE_URL at Redis to share rendered catalog responses
+# between workers.
+if os.environ.get('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a rendered catalog response stays cached for a given content version
+LESSONS_CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Most seconds a process serves its catalog snapshot before re-reading the
+# content version from the database (lessons/cache.py)
+LESSONS_CATALOG_VERSION_CHECK_SECONDS = 1
+
+# Compiled tutorial content, written by build_content_bundle (lessons/bundle.py)
+CONTENT_BUNDLE_PATH = BASE_DIR / 'lessons' / 'content' / 'course.bundle'
+
+# Most seconds one heartbeat may add to a lesson (/api/progress/heartbeat/)
+PROGRESS_HEARTBEAT_MAX_SECONDS = 60 * 60
+
+# Heartbeats and exercise attempts are buffered per process and written in
+# bulk (lessons/progress.py); False writes every change straight through
+PROGRESS_WRITE_BEHIND = True
+PROGRESS_FLUSH_INTERVAL_SECONDS = 5
+
+# Rows fetched per round-trip by the streaming progress exports (lessons/exports.py)
+PROGRESS_EXPORT_CHUNK_SIZE = 2000
+
+# Exercise runner pool (lessons/sandbox.py)
+EXERCISE_POOL_SIZE = 2
+EXERCISE_POOL_MAX_RUNS = 200
+EXERCISE_TIMEOUT_SECONDS = 5
+EXERCISE_TEST_TIMEOUT_SECONDS = 2
+EXERCISE_CPU_LIMIT_SECONDS = 5
+EXERCISE_MEMORY_LIMIT_MB = 256
+# Start runners with Django/DRF imported so Django exercises fork warm
+EXERCISE_PRELOAD_DJANGO = True
+
+# Grading results kept per process for identical resubmissions (LRU)
+EXERCISE_RESULT_CACHE_SIZE = 1024
+
+# Most submissions accepted by one /api/submit-exercises/ request
+EXERCISE_BATCH_MAX_SIZE = 500
+
+# Async grading job ids remembered per session; older ids stop being pollable
+EXERCISE_JOB_HISTORY_SIZE = 50
+
+# Longest long-poll allowed on /api/exercise-results/<job_id>/?wait=N
+EXERCISE_RESULT_MAX_WAIT = 25
+
 # Celery Configuration (for async tasks)
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+
+# Set CELERY_EAGER=1 to run tasks in-process without Redis (tests, local dev)
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_EAGER') == '1'
+CELERY_TASK_STORE_EAGER_RESULT = True
+if CELERY_TASK_ALWAYS_EAGER:
+    CELERY_RESULT_BACKEND = 'cache+memory://'